@@ -0,0 +1,84 @@
+# Import libraries
+import argparse
+import asyncio
+import json
+import time
+from contextlib import AsyncExitStack
+import httpx
+import numpy as np
+
+
+# Run `call(i, worker_id)` from `concurrency` workers for `duration` seconds, call returns False on error
+async def run_workers(call, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        iteration = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if not await call(worker_id * 7919 + iteration, worker_id):
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            iteration += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed, concurrency)
+
+
+# Send requests from `concurrency` workers for `duration` seconds
+# payload may be a list, cycled through so requests are not all identical
+# Each worker has its own keep-alive connection: a single shared httpx pool spends more CPU
+# on pool bookkeeping than on requests past a few dozen connections, capping the measured rps
+async def run_load(url: str, method: str, payload, concurrency: int, duration: float, timeout: float):
+    payloads = payload if isinstance(payload, list) else [payload]
+    limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+    async with AsyncExitStack() as stack:
+        clients = [
+            await stack.enter_async_context(httpx.AsyncClient(limits=limits, timeout=timeout))
+            for _ in range(concurrency)
+        ]
+
+        async def call(i, worker_id):
+            response = await clients[worker_id].request(method, url, json=payloads[i % len(payloads)])
+            return response.status_code < 400
+
+        return await run_workers(call, concurrency, duration)
+
+
+# Throughput and latency percentiles in milliseconds
+def summarize(latencies, errors: int, elapsed: float, concurrency: int) -> dict:
+    samples = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if len(samples) else (0.0, 0.0, 0.0)
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "requests_per_second": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure requests per second of one endpoint.")
+    parser.add_argument("url")
+    parser.add_argument("--method", default="POST")
+    parser.add_argument("--json", default='{"pokemon_name": "pikachu"}', help="JSON request body")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    payload = json.loads(args.json) if args.json else None
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_load(args.url, args.method, payload, concurrency, args.duration, args.timeout))
+        print(json.dumps(result))
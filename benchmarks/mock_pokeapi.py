@@ -0,0 +1,154 @@
+# Import libraries
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import zlib
+from collections import Counter
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
+# Small recorded set served when neither --snapshot nor --fixtures is given
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# Recorded PokéAPI responses, from a snapshot built by pokeapi_snapshot/build_snapshot.py
+# and/or a directory of <path>.json files, e.g. fixtures/pokemon/pikachu.json.
+# A fixture file answers for both the name and the ID of its resource, and a resource type
+# without a list fixture (e.g. fixtures/pokemon.json) is listed from its files
+class Fixtures:
+    def __init__(self, snapshot: str = None, fixture_dir: str = None, record_from: str = None):
+        self.conn = sqlite3.connect(f"file:{snapshot}?mode=ro", uri=True, check_same_thread=False) if snapshot else None
+        self.fixture_dir = fixture_dir
+        self.record_from = record_from.rstrip("/") if record_from else None
+        self._bodies = {}
+        self._indexes = {}
+
+    def _file(self, path: str) -> str:
+        return os.path.join(self.fixture_dir, f"{path}.json")
+
+    # {name or ID: file} and [(ID, name)] of the fixture files of a resource type
+    def _index(self, kind: str):
+        if kind not in self._indexes:
+            files, entries = {}, []
+            directory = os.path.join(self.fixture_dir, kind)
+            for file_name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+                file = os.path.join(directory, file_name)
+                with open(file, "rb") as f:
+                    data = json.loads(f.read())
+                if not isinstance(data, dict) or "id" not in data:
+                    continue
+                name = data.get("name", str(data["id"]))
+                files[str(data["id"])] = files[name] = file
+                entries.append((data["id"], name))
+            self._indexes[kind] = files, sorted(set(entries))
+        return self._indexes[kind]
+
+    def _load_file(self, path: str):
+        if os.path.exists(self._file(path)):
+            with open(self._file(path), "rb") as f:
+                return f.read()
+        kind, _, key = path.partition("/")
+        files, entries = self._index(kind)
+        if key and key in files:
+            with open(files[key], "rb") as f:
+                return f.read()
+        if not key and entries:
+            results = [{"name": name, "url": f"{POKEAPI_BASE_URL}/{kind}/{resource_id}/"} for resource_id, name in entries]
+            return json.dumps({"count": len(results), "next": None, "previous": None, "results": results}).encode()
+        return None
+
+    def _load(self, path: str):
+        if self.fixture_dir:
+            body = self._load_file(path)
+            if body is not None:
+                return body
+        if self.conn is not None:
+            row = self.conn.execute(
+                "SELECT r.body FROM paths p JOIN resources r ON r.id = p.resource WHERE p.path = ?", (path,)
+            ).fetchone()
+            if row is not None:
+                return zlib.decompress(row[0])
+        return None
+
+    # Fetch a missing fixture from the real API and store it in the fixture directory
+    async def _record(self, path: str, query: str):
+        url = f"{self.record_from}/{path}" + (f"?{query}" if query else "")
+        async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
+            response = await client.get(url)
+        if response.status_code != 200:
+            return None
+        os.makedirs(os.path.dirname(self._file(path)), exist_ok=True)
+        with open(self._file(path), "wb") as f:
+            f.write(response.content)
+        self._indexes.pop(path.split("/", 1)[0], None)
+        return response.content
+
+    # Raw JSON body of a resource path, e.g. "pokemon/25", or None
+    async def get(self, path: str, query: str = ""):
+        path = path.strip("/").lower()
+        if path not in self._bodies:
+            body = self._load(path)
+            if body is None and self.record_from and self.fixture_dir:
+                body = await self._record(path, query)
+            self._bodies[path] = body
+        return self._bodies[path]
+
+
+def create_app(fixtures: Fixtures, latency_ms: float = 0, jitter_ms: float = 0,
+               error_rate: float = 0, error_status: int = 503) -> FastAPI:
+    app = FastAPI(title="Mock PokéAPI")
+    stats = {"requests": 0, "errors_injected": 0, "not_found": 0, "by_resource": Counter()}
+
+    @app.get("/_mock/stats")
+    async def mock_stats():
+        return stats
+
+    @app.post("/_mock/reset")
+    async def mock_reset():
+        stats.update(requests=0, errors_injected=0, not_found=0, by_resource=Counter())
+        return stats
+
+    @app.get("/api/v2/{path:path}")
+    async def resource(path: str, request: Request):
+        stats["requests"] += 1
+        stats["by_resource"][path.strip("/").split("/", 1)[0]] += 1
+        delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if error_rate and random.random() < error_rate:
+            stats["errors_injected"] += 1
+            return Response(status_code=error_status)
+        body = await fixtures.get(path, request.url.query)
+        if body is None:
+            stats["not_found"] += 1
+            return Response(b"Not Found", status_code=404)
+        # Links inside the payload point back at the mock
+        base = f"{str(request.base_url).rstrip('/')}/api/v2"
+        return Response(body.replace(POKEAPI_BASE_URL.encode(), base.encode()), media_type="application/json")
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded PokéAPI responses with injected latency and errors.")
+    parser.add_argument("--snapshot", help="SQLite snapshot built by pokeapi_snapshot/build_snapshot.py")
+    parser.add_argument("--fixtures", help="Directory of <path>.json fixtures, e.g. pokemon/pikachu.json "
+                        "(default: benchmarks/fixtures when --snapshot is not given either)")
+    parser.add_argument("--record-from", help="Fetch and save fixtures missing from --fixtures, e.g. https://pokeapi.co/api/v2")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Uniform jitter around --latency-ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+    if not args.snapshot and not args.fixtures:
+        args.fixtures = DEFAULT_FIXTURES
+    fixtures = Fixtures(args.snapshot, args.fixtures, args.record_from)
+    app = create_app(fixtures, args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
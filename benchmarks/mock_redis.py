@@ -0,0 +1,141 @@
+# Import libraries
+import argparse
+import asyncio
+import fnmatch
+import time
+
+# In-memory stand-in speaking enough of the Redis protocol for the shared PokéAPI cache tier:
+# HELLO, PING, GET, SET (EX/PX), PTTL, TTL, DEL, EXISTS, SCAN, DBSIZE, FLUSHDB, SELECT and CLIENT
+
+
+# Values with their monotonic expiry time, None for keys without expiry
+class Store:
+    def __init__(self):
+        self.data = {}
+        self.commands = 0
+
+    def _live(self, key: bytes):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def execute(self, args: list):
+        self.commands += 1
+        command = args[0].upper()
+        if command == b"HELLO":
+            proto = int(args[1]) if len(args) > 1 else 2
+            return {b"server": b"mock-redis", b"version": b"7.0.0", b"proto": proto}
+        if command == b"PING":
+            return b"PONG"
+        if command in (b"SELECT", b"CLIENT"):
+            return b"OK"
+        if command == b"GET":
+            entry = self._live(args[1])
+            return entry[0] if entry else None
+        if command == b"SET":
+            expires_at = None
+            options = [arg.upper() for arg in args[3::2]]
+            for option, value in zip(options, args[4::2]):
+                if option == b"EX":
+                    expires_at = time.monotonic() + int(value)
+                elif option == b"PX":
+                    expires_at = time.monotonic() + int(value) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"OK"
+        if command in (b"PTTL", b"TTL"):
+            entry = self._live(args[1])
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            left = entry[1] - time.monotonic()
+            return int(left * 1000) if command == b"PTTL" else int(left)
+        if command == b"DEL":
+            return sum(self.data.pop(key, None) is not None for key in args[1:])
+        if command == b"EXISTS":
+            return sum(self._live(key) is not None for key in args[1:])
+        if command == b"SCAN":
+            pattern = b"*"
+            for option, value in zip(args[2::2], args[3::2]):
+                if option.upper() == b"MATCH":
+                    pattern = value
+            keys = [key for key in list(self.data) if self._live(key) and fnmatch.fnmatchcase(key, pattern)]
+            return [b"0", keys]
+        if command == b"DBSIZE":
+            return len(self.data)
+        if command == b"FLUSHDB":
+            self.data.clear()
+            return b"OK"
+        return Exception(f"ERR unknown command '{command.decode()}'")
+
+
+# RESP2 reply, or RESP3 after the client switched with HELLO 3
+def encode(value, resp3: bool = False) -> bytes:
+    if value is None:
+        return b"_\r\n" if resp3 else b"$-1\r\n"
+    if isinstance(value, Exception):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, dict):
+        return f"%{len(value)}\r\n".encode() + b"".join(encode(k, resp3) + encode(v, resp3) for k, v in value.items())
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b"".join(encode(item, resp3) for item in value)
+    if value in (b"OK", b"PONG"):
+        return b"+" + value + b"\r\n"
+    return f"${len(value)}\r\n".encode() + value + b"\r\n"
+
+
+# One command, a RESP array of bulk strings, or None when the client disconnected
+async def read_command(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+def create_handler(store: Store):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        resp3 = False
+        try:
+            while True:
+                args = await read_command(reader)
+                if args is None:
+                    break
+                if args:
+                    reply = store.execute(args)
+                    if args[0].upper() == b"HELLO":
+                        resp3 = reply[b"proto"] == 3
+                    writer.write(encode(reply, resp3))
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def main(host: str, port: int):
+    server = await asyncio.start_server(create_handler(Store()), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve an in-memory Redis stand-in for the shared cache tier.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port))
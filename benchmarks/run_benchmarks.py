@@ -0,0 +1,161 @@
+# Import libraries
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+from datetime import datetime, timezone
+import httpx
+from load_benchmark import run_load, run_workers
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# Pokémon of benchmarks/fixtures, the mock PokéAPI's default data, that have a counter in it
+DEFAULT_POKEMON = ["pikachu", "charizard", "raichu", "gengar", "lucario", "pichu", "snorlax"]
+
+
+# (scenario, service, path or tool, payloads) for every benchmarked endpoint and MCP tool
+def build_scenarios(pokemon: list) -> list:
+    singles = [{"pokemon_name": name} for name in pokemon]
+    pairs = [
+        {"pokemon_name1": first, "pokemon_name2": second}
+        for first, second in zip(pokemon, pokemon[1:] + pokemon[:1])
+    ]
+    return [
+        ("pokemon-info", "info", "/pokemon-info", singles),
+        ("pokemon-compare", "compare", "/pokemon-compare/", pairs),
+        ("counter-pokemon", "counter", "/counter-pokemon/", singles),
+        ("mcp:pokemon_info", "mcp", "pokemon_info", singles),
+        ("mcp:pokemon_compare", "mcp", "pokemon_compare", pairs),
+        ("mcp:counter_pokemon", "mcp", "counter_pokemon", singles),
+    ]
+
+
+# Upstream request counters of the mock PokéAPI, None without a mock
+async def mock_stats(mock_url: str):
+    if not mock_url:
+        return None
+    async with httpx.AsyncClient(timeout=10) as client:
+        response = await client.get(f"{mock_url.rstrip('/')}/_mock/stats")
+        return response.json()
+
+
+def upstream_delta(before, after) -> dict:
+    if before is None or after is None:
+        return {}
+    return {
+        "upstream_requests": after["requests"] - before["requests"],
+        "upstream_errors_injected": after["errors_injected"] - before["errors_injected"],
+        "upstream_by_resource": {
+            resource: count - before["by_resource"].get(resource, 0)
+            for resource, count in after["by_resource"].items()
+            if count - before["by_resource"].get(resource, 0)
+        },
+    }
+
+
+# Drive an MCP tool over the server's HTTP transport
+async def run_mcp_load(mcp_url: str, tool: str, payloads: list, concurrency: int, duration: float) -> dict:
+    from fastmcp import Client
+
+    async with Client(mcp_url) as client:
+
+        async def call(i, worker_id):
+            result = await client.call_tool(tool, payloads[i % len(payloads)], raise_on_error=False)
+            data = result.structured_content
+            return not result.is_error and not (isinstance(data, dict) and "error" in data)
+
+        return await run_workers(call, concurrency, duration)
+
+
+async def run_scenario(scenario, urls: dict, mock_url: str, concurrency: int, duration: float, timeout: float) -> dict:
+    name, service, target, payloads = scenario
+    before = await mock_stats(mock_url)
+    if service == "mcp":
+        summary = await run_mcp_load(urls["mcp"], target, payloads, concurrency, duration)
+    else:
+        summary = await run_load(f"{urls[service].rstrip('/')}{target}", "POST", payloads, concurrency, duration, timeout)
+    after = await mock_stats(mock_url)
+    return {"scenario": name, **summary, **upstream_delta(before, after)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# p95 and throughput change of every scenario/concurrency present in a baseline result file
+def compare_to_baseline(results: list, baseline_path: str) -> list:
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+    changes = []
+    for result in results:
+        previous = baseline.get((result["scenario"], result["concurrency"]))
+        if previous is None or not previous["p95_ms"] or not previous["requests_per_second"]:
+            continue
+        changes.append({
+            "scenario": result["scenario"],
+            "concurrency": result["concurrency"],
+            "p95_change_pct": round((result["p95_ms"] / previous["p95_ms"] - 1) * 100, 1),
+            "throughput_change_pct": round((result["requests_per_second"] / previous["requests_per_second"] - 1) * 100, 1),
+        })
+    return changes
+
+
+async def main(args):
+    urls = {"info": args.info_url, "compare": args.compare_url, "counter": args.counter_url, "mcp": args.mcp_url}
+    scenarios = [
+        scenario for scenario in build_scenarios(args.pokemon)
+        if urls[scenario[1]] and (not args.scenarios or scenario[0] in args.scenarios)
+    ]
+    started_at = datetime.now(timezone.utc)
+    results = []
+    for scenario in scenarios:
+        for concurrency in args.concurrency:
+            result = await run_scenario(scenario, urls, args.mock_url, concurrency, args.duration, args.timeout)
+            print(json.dumps(result))
+            results.append(result)
+    report = {
+        "label": args.label,
+        "git_commit": git_commit(),
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "settings": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "pokemon": args.pokemon,
+            "urls": urls,
+            "mock_url": args.mock_url,
+        },
+        "results": results,
+    }
+    if args.baseline:
+        report["baseline"] = args.baseline
+        report["changes"] = compare_to_baseline(results, args.baseline)
+        for change in report["changes"]:
+            print(json.dumps(change))
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{started_at.strftime('%Y%m%dT%H%M%SZ')}_{args.label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Pokémon services and MCP tools, results saved as JSON.")
+    parser.add_argument("--info-url", help="e.g. http://localhost:8001")
+    parser.add_argument("--compare-url", help="e.g. http://localhost:8002")
+    parser.add_argument("--counter-url", help="e.g. http://localhost:8003")
+    parser.add_argument("--mcp-url", help="MCP HTTP endpoint, e.g. http://localhost:5000/sse")
+    parser.add_argument("--mock-url", help="Mock PokéAPI, for upstream call counts, e.g. http://localhost:8900")
+    parser.add_argument("--scenarios", nargs="+", help="Only these scenarios, e.g. pokemon-info mcp:pokemon_info")
+    parser.add_argument("--pokemon", nargs="+", default=DEFAULT_POKEMON, help="Names cycled through the requests")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help="Earlier result file to compare p95 latency and throughput against")
+    asyncio.run(main(parser.parse_args()))
@@ -1,30 +1,74 @@
 # Import libraries
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import os
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from pokemon_counter import *
-import logging
-import sys
+from move_table import get_move_table
+from team_matchup import get_matchup_matrix
+from pokeapi_client import cache, close_async_client, negative_cache
+from metrics import install_metrics
+from tracing import install_tracing
+from fast_json import FastJSONResponse, RenderedResponses, dumps
+from deadline import BudgetExceeded, install_deadline, remaining
+from single_flight import SingleFlight, normalize_name
+from log_setup import get_logger
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+logger = get_logger()
 
 
 # Create FastAPI app
-app = FastAPI(title="Pokémon Comparison API")
+app = FastAPI(title="Pokémon Comparison API", default_response_class=FastJSONResponse)
+
+# Serialized complete counter rankings of recently looked up names, partial ones are never kept
+rendered = RenderedResponses()
+
+install_metrics(app, {"response": cache, "negative": negative_cache, "rendered": rendered})
+install_tracing(app, "counter-pokemon")
+install_deadline(app)
+
+# Concurrent identical counter requests share one computation
+flights = SingleFlight()
+
+# Streaming counter defaults: cutoff in seconds and minimum seconds between provisional rankings
+STREAM_DEADLINE = float(os.getenv("COUNTER_STREAM_DEADLINE", "5"))
+STREAM_REFRESH = float(os.getenv("COUNTER_STREAM_REFRESH", "0.25"))
+
+# Largest roster accepted by the matchup matrix
+MAX_TEAM_SIZE = 24
+
+# Length of the rankings of /counter-pokemon/, the ones kept rendered
+RANKING_SIZE = 10
+
+
+# Build the type chart, move table and stat table once before serving requests
+@app.on_event("startup")
+def load_counter_data():
+    logger.info("Loading type effectiveness chart")
+    get_type_chart()
+    logger.info("Loading move table")
+    get_move_table()
+    logger.info("Loading base stat table")
+    get_stat_table()
+
+
+# Readiness probe. Counters are served from the tables loaded above, before the server accepts
+# connections, so this service has no cache warmer and is ready once it answers
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    return {"ready": True, "pokemon": len(get_stat_table())}
+
+
+# Release pooled PokéAPI connections on shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await close_async_client()
 
 
 # Entrypoint of the app
 @app.get("/")
-def root():
+async def root():
     logger.info("Root endpoint '/' accessed.")
     return {"message": "Welcome to the Pokémon Comparison API"}
 
@@ -36,18 +80,109 @@ class RequestBody(BaseModel):
 
 # Endpoint to handle counter pokemon of a pokemon
 @app.post("/counter-pokemon/")
-def counter_a_pokemon(req: RequestBody):
-    logger.info(f"Received request to find counters for Pokémon: {req.pokemon_name}")
+async def counter_a_pokemon(req: RequestBody):
+    logger.info("Received request to find counters for Pokémon: %s", req.pokemon_name)
     try:
-        result = get_ranked_counter_pokemons(req.pokemon_name)
+        name = normalize_name(req.pokemon_name)
+        key = f"counter-pokemon/{name}"
+        cached = rendered.get(key)
+        if cached is not None:
+            return cached
+        budget = remaining()
+        if budget is None:
+            result = await flights.do(("counter-pokemon", name), get_ranked_counter_pokemons, name)
+        else:
+            # A budgeted result may be partial, so it is not shared with other callers
+            result = await get_ranked_counter_pokemons(name, deadline=budget)
         if not result:
-            logger.warning(f"No counter data found for Pokémon: {req.pokemon_name}")
+            logger.warning("No counter data found for Pokémon: %s", req.pokemon_name)
             raise HTTPException(status_code=404, detail="Comparison data not found")
-        logger.info(f"Successfully fetched counter data for Pokémon: {req.pokemon_name}")
-        return result
+        logger.info("Successfully fetched counter data for Pokémon: %s", req.pokemon_name)
+        if isinstance(result, dict):
+            return FastJSONResponse(result)
+        return rendered.render(key, result)
+    except BudgetExceeded as e:
+        logger.warning("Request budget exhausted for counters of Pokémon '%s'", req.pokemon_name)
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
-        logger.error(f"Error occurred while fetching counters for Pokémon '{req.pokemon_name}': {e}")
+        logger.error("Error occurred while fetching counters for Pokémon '%s': %s", req.pokemon_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Format of Request Body of the streaming endpoint
+class StreamRequestBody(BaseModel):
+    pokemon_name: str
+    top_n: int = RANKING_SIZE
+    # Seconds before unfinished fetches are dropped, the request budget or STREAM_DEADLINE when unset
+    deadline: float | None = None
+
+
+# Endpoint streaming provisional counter rankings as stats arrive, then the final one.
+# NDJSON by default, server-sent events when the client accepts text/event-stream.
+# A complete ranking already rendered is answered at once as a final event with "cached": true
+@app.post("/counter-pokemon/stream")
+async def counter_a_pokemon_stream(req: StreamRequestBody, request: Request):
+    logger.info("Received streaming counter request for Pokémon: %s", req.pokemon_name)
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    name = normalize_name(req.pokemon_name)
+    key = f"counter-pokemon/{name}" if req.top_n == RANKING_SIZE else None
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    cached = rendered.body(key) if key is not None else None
+    if cached is not None:
+        line = b'{"event":"final","cached":true,"dropped":0,"counters":%s}' % cached
+        return Response(b"event: final\ndata: %s\n\n" % line if sse else line + b"\n", media_type=media_type)
+    budget = remaining()
+    deadline = req.deadline if req.deadline is not None else (budget if budget is not None else STREAM_DEADLINE)
+    if budget is not None:
+        deadline = min(deadline, budget)
+    events = stream_ranked_counter_pokemons(name, top_n=req.top_n, deadline=deadline, refresh_every=STREAM_REFRESH)
+
+    async def body():
+        try:
+            async for event in events:
+                # A complete ranking is kept for /counter-pokemon/ and later streams
+                if event["event"] == "final" and event["counters"] and not event["dropped"] and key is not None:
+                    rendered.render(key, event["counters"])
+                line = dumps(event)
+                yield b"event: %s\ndata: %s\n\n" % (event["event"].encode(), line) if sse else line + b"\n"
+        except Exception as e:
+            logger.error("Error occurred while streaming counters for Pokémon '%s': %s", req.pokemon_name, e)
+            status_code = 504 if isinstance(e, BudgetExceeded) else 500
+            line = dumps({"event": "error", "status_code": status_code, "detail": str(e)})
+            yield b"event: error\ndata: %s\n\n" % line if sse else line + b"\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(body(), media_type=media_type)
+
+
+# Format of Request Body of the matchup matrix
+class MatchupRequest(BaseModel):
+    team1: list[str] = Field(min_length=1, max_length=MAX_TEAM_SIZE)
+    team2: list[str] = Field(min_length=1, max_length=MAX_TEAM_SIZE)
+
+
+# Endpoint to score every member of one roster against every member of another
+@app.post("/matchup-matrix/")
+async def matchup_matrix(req: MatchupRequest):
+    logger.info("Received matchup matrix request: %s vs %s", req.team1, req.team2)
+    try:
+        result = await get_matchup_matrix(req.team1, req.team2)
+        if "status_code" in result:
+            logger.warning("Matchup matrix failed: %s", result['detail'])
+            raise HTTPException(status_code=result["status_code"], detail=result["detail"])
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except BudgetExceeded as e:
+        logger.warning("Request budget exhausted for matchup matrix of %s vs %s", req.team1, req.team2)
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error("Error occurred while scoring matchup matrix: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
 
+# Endpoint to get request coalescing counters
+@app.get("/single-flight-stats")
+async def single_flight_stats():
+    return flights.stats()
@@ -0,0 +1,116 @@
+# Import libraries
+import numpy as np
+from type_chart import TYPE_NAMES
+from move_table import DAMAGE_CLASSES
+
+# Damage estimates use level 50 Pokémon with 31 IVs and no EVs or natures
+LEVEL = 50
+STAB = 1.5
+# Power assumed for same-type moves of a Pokémon whose learnset is unknown
+DEFAULT_MOVE_POWER = 60
+SPEED_TIERS = {1: "faster", 0: "tie", -1: "slower"}
+# Move type and damage class reported for pairs where no move does any damage
+NO_MOVE = -1
+
+
+# Level 50 stats from base stats
+def level_stat(base: np.ndarray) -> np.ndarray:
+    return base.astype(np.float32) + 20
+
+
+def level_hp(base: np.ndarray) -> np.ndarray:
+    return base.astype(np.float32) + 75
+
+
+# Level 50 stats, types and best move powers of a group of Pokémon, as columns
+class Combatants:
+    def __init__(self, table, ids):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.hp = level_hp(table.column("hp")[self.ids])
+        self.attack = level_stat(table.column("attack")[self.ids])
+        self.defense = level_stat(table.column("defense")[self.ids])
+        self.special_attack = level_stat(table.column("special-attack")[self.ids])
+        self.special_defense = level_stat(table.column("special-defense")[self.ids])
+        self.speed = level_stat(table.column("speed")[self.ids])
+        # types[slot, i] is a type index or -1 for an empty slot
+        self.types = table.types[:, self.ids].astype(np.int64)
+        self.move_power = table.move_power[:, :, self.ids].astype(np.float32)
+        # Unknown learnsets get same-type moves of DEFAULT_MOVE_POWER in both classes
+        unknown = ~self.move_power.any(axis=(0, 1))
+        for slot in range(self.types.shape[0]):
+            has_type = unknown & (self.types[slot] >= 0)
+            self.move_power[self.types[slot, has_type], :, np.flatnonzero(has_type)] = DEFAULT_MOVE_POWER
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# Multiplier of every attacking type against each defender, shape (types, defenders)
+def type_effectiveness(matrix: np.ndarray, defender_types: np.ndarray) -> np.ndarray:
+    # An extra column of ones stands in for empty type slots (-1)
+    padded = np.hstack([matrix, np.ones((matrix.shape[0], 1), dtype=matrix.dtype)])
+    effectiveness = np.ones((matrix.shape[0], defender_types.shape[1]), dtype=np.float32)
+    for slot in defender_types:
+        effectiveness *= padded[:, slot]
+    return effectiveness
+
+
+# STAB multiplier of every move type for each attacker, shape (types, attackers)
+def stab_multipliers(attacker_types: np.ndarray) -> np.ndarray:
+    stab = np.ones((len(TYPE_NAMES), attacker_types.shape[1]), dtype=np.float32)
+    for slot in attacker_types:
+        valid = slot >= 0
+        stab[slot[valid], np.flatnonzero(valid)] = STAB
+    return stab
+
+
+# Best expected damage of every attacker against every defender in one array pass.
+# Returns damage as % of the defender's HP and the move type and damage class used, each (attackers, defenders).
+# Pairs without any damaging move (e.g. an immune defender) get NO_MOVE as move type and damage class
+def best_damage(attackers: Combatants, defenders: Combatants, matrix: np.ndarray):
+    offense = np.stack([attackers.attack, attackers.special_attack])        # (classes, N)
+    defense = np.stack([defenders.defense, defenders.special_defense])      # (classes, M)
+    power = attackers.move_power                                            # (types, classes, N)
+    ratio = offense[:, :, None] / defense[:, None, :]                       # (classes, N, M)
+    base = ((2 * LEVEL / 5 + 2) * power[:, :, :, None] * ratio[None] / 50 + 2) * (power[:, :, :, None] > 0)
+    multiplier = (
+        stab_multipliers(attackers.types)[:, None, :, None]
+        * type_effectiveness(matrix, defenders.types)[:, None, None, :]
+    )
+    damage = (base * multiplier).reshape(-1, len(attackers), len(defenders))  # (types * classes, N, M)
+    best = damage.argmax(axis=0)
+    best_damage = np.take_along_axis(damage, best[None], axis=0)[0]
+    move_type, damage_class = np.divmod(best, len(DAMAGE_CLASSES))
+    no_move = best_damage <= 0
+    move_type[no_move] = NO_MOVE
+    damage_class[no_move] = NO_MOVE
+    return best_damage / defenders.hp[None, :] * 100, move_type, damage_class
+
+
+# Full matchup of every attacker against every defender, each value shaped (attackers, defenders)
+def matchup(attackers: Combatants, defenders: Combatants, matrix: np.ndarray) -> dict:
+    damage_dealt, move_type, damage_class = best_damage(attackers, defenders, matrix)
+    damage_taken = best_damage(defenders, attackers, matrix)[0].T
+    speed = np.sign(attackers.speed[:, None] - defenders.speed[None, :]).astype(np.int8)
+    # Hits needed to knock out, inf when no damage can be done
+    with np.errstate(divide="ignore"):
+        turns_to_ko = np.ceil(100 / damage_dealt)
+        turns_to_be_ko = np.ceil(100 / damage_taken)
+    # A 1v1 is won by knocking out first, the faster side moving first on equal turns
+    wins = (turns_to_ko < turns_to_be_ko) | ((turns_to_ko == turns_to_be_ko) & (speed > 0) & np.isfinite(turns_to_ko))
+    return {
+        "damage_dealt": damage_dealt,
+        "damage_taken": damage_taken,
+        "move_type": move_type,
+        "damage_class": damage_class,
+        "speed": speed,
+        "turns_to_ko": turns_to_ko,
+        "turns_to_be_ko": turns_to_be_ko,
+        "wins": wins,
+    }
+
+
+# Ranking score of a matchup: 1v1 wins first, then damage dealt minus damage taken (in % of HP)
+def matchup_score(result: dict) -> np.ndarray:
+    margin = np.clip(result["damage_dealt"] - result["damage_taken"], -999, 999)
+    return result["wins"] * 2000 + margin
@@ -0,0 +1,120 @@
+# Import libraries
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from opentelemetry import trace
+
+# Logging settings, LOG_FORMAT is json or text
+LOGGER_NAME = "pokemon-info-logger"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Sample rate overrides per logger, e.g. "lookup=1,counter.fetch=0.05"
+LOG_SAMPLE_RATES = dict(
+    (name.strip(), float(rate))
+    for name, rate in (item.split("=", 1) for item in os.getenv("LOG_SAMPLE_RATES", "").split(",") if "=" in item)
+)
+
+# Attributes every LogRecord has, anything else was passed through extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+# One JSON object per line, with extra= fields and the active trace ID
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# Drops a share of records below WARNING, errors are always kept
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+# Stamps records with the trace ID of the span they were logged in
+class TraceFilter(logging.Filter):
+    def filter(self, record):
+        context = trace.get_current_span().get_span_context()
+        if context.is_valid:
+            record.trace_id = format(context.trace_id, "032x")
+        return True
+
+
+# Hands records to the listener thread, formatting only the message text here
+class LazyQueueHandler(QueueHandler):
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    # Drop the record rather than block the event loop when the queue is full
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+_listener = None
+
+
+# Route the service logger through a queue to a stdout writer thread, once per process
+def setup_logging():
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(TraceFilter())
+    logger.addHandler(queue_handler)
+
+
+# Service logger, or a sampled child logger for hot-path messages, e.g. get_logger("lookup", 0.1)
+def get_logger(name: str = None, sample_rate: float = 1.0) -> logging.Logger:
+    setup_logging()
+    if name is None:
+        return logging.getLogger(LOGGER_NAME)
+    logger = logging.getLogger(f"{LOGGER_NAME}.{name}")
+    rate = LOG_SAMPLE_RATES.get(name, sample_rate)
+    if rate < 1 and not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        logger.addFilter(SamplingFilter(rate))
+    return logger
@@ -0,0 +1,77 @@
+# Import libraries
+import time
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+# Payload size buckets in bytes, 100 B to 1 MB
+SIZE_BUCKETS = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)
+
+# Endpoint metrics
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests by endpoint",
+    ["method", "endpoint", "status"],
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Size of HTTP response bodies by endpoint",
+    ["method", "endpoint"], buckets=SIZE_BUCKETS,
+)
+
+# PokéAPI metrics, source is one of cache, snapshot, negative_cache or network
+POKEAPI_REQUESTS = Counter(
+    "pokeapi_requests_total", "PokéAPI resource lookups by resource type and where they were answered",
+    ["resource", "source"],
+)
+POKEAPI_LATENCY = Histogram(
+    "pokeapi_request_duration_seconds", "Latency of PokéAPI network calls by resource type",
+    ["resource", "status"],
+)
+POKEAPI_RESPONSE_SIZE = Histogram(
+    "pokeapi_response_size_bytes", "Size of PokéAPI response bodies by resource type",
+    ["resource"], buckets=SIZE_BUCKETS,
+)
+POKEAPI_IN_FLIGHT = Gauge(
+    "pokeapi_requests_in_flight", "PokéAPI network calls currently waiting for a response",
+    ["resource"],
+)
+
+
+# Exposes ResponseCache/NegativeCache counters as gauges at scrape time
+class CacheCollector:
+    def __init__(self, caches: dict):
+        self.caches = caches
+
+    def collect(self):
+        families = {}
+        for cache_name, cache in self.caches.items():
+            for key, value in cache.stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                if key not in families:
+                    families[key] = GaugeMetricFamily(
+                        f"pokeapi_cache_{key}", f"PokéAPI cache {key.replace('_', ' ')}", labels=["cache"]
+                    )
+                families[key].add_metric([cache_name], value)
+        return list(families.values())
+
+
+# Add the latency middleware and GET /metrics to an app
+def install_metrics(app: FastAPI, caches: dict = None):
+    if caches:
+        REGISTRY.register(CacheCollector(caches))
+
+    @app.middleware("http")
+    async def record_request(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        REQUEST_LATENCY.labels(request.method, endpoint, str(response.status_code)).observe(time.perf_counter() - start)
+        size = response.headers.get("content-length")
+        if size is not None:
+            RESPONSE_SIZE.labels(request.method, endpoint).observe(int(size))
+        return response
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,105 @@
+# Import libraries
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pokeapi_client import POKEAPI_BASE_URL, get_json, resource_url, snapshot
+from type_chart import TYPE_INDEX, TYPE_NAMES
+from records import Move
+from log_setup import get_logger
+
+logger = get_logger()
+
+# Damage classes of attacking moves, status moves have no power
+DAMAGE_CLASSES = ("physical", "special")
+DAMAGE_CLASS_INDEX = {name: i for i, name in enumerate(DAMAGE_CLASSES)}
+MOVE_TABLE_PATH = os.getenv("MOVE_TABLE_PATH")
+
+
+# Type, damage class and power of every damaging move, by move name
+class MoveTable:
+    def __init__(self, moves: dict = None):
+        # moves[name] is (type index, damage class index, power)
+        self.moves = moves or {}
+
+    # Add a Move record, status and fixed-damage moves are skipped
+    def add(self, move: Move):
+        if move.power and move.damage_class in DAMAGE_CLASS_INDEX and move.type in TYPE_INDEX:
+            self.moves[move.name] = (TYPE_INDEX[move.type], DAMAGE_CLASS_INDEX[move.damage_class], int(move.power))
+
+    # Highest move power per (type, damage class) among a Pokémon's learnable moves
+    def best_powers(self, move_names) -> np.ndarray:
+        powers = np.zeros((len(TYPE_NAMES), len(DAMAGE_CLASSES)), dtype=np.int16)
+        for name in move_names:
+            move = self.moves.get(name)
+            if move is not None:
+                type_idx, class_idx, power = move
+                powers[type_idx, class_idx] = max(powers[type_idx, class_idx], power)
+        return powers
+
+    def __len__(self):
+        return len(self.moves)
+
+    def to_dict(self):
+        return {"types": list(TYPE_NAMES), "moves": {name: list(move) for name, move in self.moves.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        if list(data["types"]) != list(TYPE_NAMES):
+            raise ValueError("Move table snapshot uses a different type order")
+        return cls({name: tuple(move) for name, move in data["moves"].items()})
+
+
+# Build the move table from the snapshot or PokéAPI /move resources
+def build_move_table(max_workers: int = 20) -> MoveTable:
+    table = MoveTable()
+    if snapshot is not None:
+        for data in snapshot.iter_kind("move"):
+            table.add(Move.from_payload(data))
+        logger.info("Built move table with %s damaging moves from snapshot", len(table))
+        return table
+    status_code, listing = get_json(f"{POKEAPI_BASE_URL}/move?limit=100000")
+    if status_code != 200:
+        raise RuntimeError(f"Failed to list moves, status code: {status_code}")
+    names = [entry["name"] for entry in listing["results"]]
+
+    def load_move(name):
+        status_code, data = get_json(resource_url("move", name), timeout=5, store=False)
+        return data if status_code == 200 else None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for data in executor.map(load_move, names):
+            if data is not None:
+                table.add(data)
+    logger.info("Built move table with %s damaging moves", len(table))
+    return table
+
+
+def save_move_table(table: MoveTable, path: str):
+    with open(path, "w") as f:
+        json.dump(table.to_dict(), f, separators=(",", ":"))
+
+
+def load_move_table(path: str) -> MoveTable:
+    with open(path) as f:
+        return MoveTable.from_dict(json.load(f))
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+# Process-wide move table, loaded from snapshot or built once
+def get_move_table() -> MoveTable:
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                if MOVE_TABLE_PATH and os.path.exists(MOVE_TABLE_PATH):
+                    _table = load_move_table(MOVE_TABLE_PATH)
+                else:
+                    _table = build_move_table()
+                    if MOVE_TABLE_PATH:
+                        save_move_table(_table, MOVE_TABLE_PATH)
+    return _table
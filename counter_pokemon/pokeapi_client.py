@@ -0,0 +1,235 @@
+# Import libraries
+import os
+import time
+import httpx
+from opentelemetry.trace import SpanKind
+from metrics import POKEAPI_IN_FLIGHT, POKEAPI_LATENCY, POKEAPI_REQUESTS, POKEAPI_RESPONSE_SIZE
+from pokeapi_cache import AccessLog, NegativeCache, ResponseCache, create_backend
+from deadline import BudgetExceeded, budget_timeout, remaining
+from pokeapi_snapshot import OFFLINE, load_snapshot, snapshot_key
+from records import parse_record, to_payload
+from tracing import tracer
+
+# PokéAPI settings
+POKEAPI_BASE_URL = os.getenv("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2").rstrip("/")
+CACHE_DIR = os.getenv("POKEAPI_CACHE_DIR")
+HTTP2 = os.getenv("POKEAPI_HTTP2", "1") == "1"
+MAX_CONNECTIONS = int(os.getenv("POKEAPI_MAX_CONNECTIONS", "20"))
+DEFAULT_TIMEOUT = float(os.getenv("POKEAPI_TIMEOUT", "10"))
+
+# Cache lifetime per resource type, e.g. "type=604800,move=604800", others use POKEAPI_CACHE_TTL
+CACHE_TTLS = {
+    kind.strip(): float(ttl)
+    for kind, ttl in (item.split("=", 1) for item in os.getenv("POKEAPI_CACHE_TTLS", "").split(",") if "=" in item)
+}
+
+# Shared response cache keyed by resource URL, backed by a tier shared between replicas if configured.
+# Memory holds parsed records, the shared tier their compact PokéAPI-shaped JSON
+cache = ResponseCache(
+    max_size=int(os.getenv("POKEAPI_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("POKEAPI_CACHE_TTL", "86400")),
+    backend=create_backend(
+        os.getenv("POKEAPI_CACHE_BACKEND"),
+        redis_url=os.getenv("POKEAPI_REDIS_URL"),
+        sqlite_path=os.path.join(CACHE_DIR, "pokeapi_cache.sqlite3") if CACHE_DIR else None,
+    ),
+    version=os.getenv("POKEAPI_CACHE_VERSION", "1"),
+    encode=to_payload,
+    decode=lambda key, data: parse_record(resource_type(key), data),
+)
+
+# Upstream 404s, remembered briefly so retries of bad names stay local
+negative_cache = NegativeCache(
+    max_size=int(os.getenv("POKEAPI_NEGATIVE_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("POKEAPI_NEGATIVE_CACHE_TTL", "300")),
+)
+
+# Lookup counts per resource path, read by the cache warmer of the next process
+access_log = AccessLog(
+    os.getenv("WARM_ACCESS_LOG") or (os.path.join(CACHE_DIR, "access_counts.json") if CACHE_DIR else None)
+)
+
+# Local PokéAPI snapshot served before the network, if configured
+snapshot = load_snapshot()
+
+# Connection pools shared by every request of the process
+_limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+_client = httpx.Client(http2=HTTP2, limits=_limits, timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+_async_client = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(http2=HTTP2, limits=_limits, timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+    return _async_client
+
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+# Build the URL of a PokéAPI resource
+def resource_url(resource: str, name) -> str:
+    return f"{POKEAPI_BASE_URL}/{resource}/{str(name).lower()}"
+
+
+# Resource type of a PokéAPI URL, e.g. "pokemon" for .../pokemon/25
+def resource_type(url: str) -> str:
+    return snapshot_key(url).split("/", 1)[0]
+
+
+# Cache lifetime of a resource URL
+def cache_ttl(url: str):
+    return CACHE_TTLS.get(resource_type(url))
+
+
+# Snapshot lookup, returns a record or None
+def _get_snapshot(url: str):
+    if snapshot is None:
+        return None
+    data = snapshot.get(url)
+    if data is None:
+        return None
+    POKEAPI_REQUESTS.labels(resource_type(url), "snapshot").inc()
+    return parse_record(resource_type(url), data)
+
+
+def _cache_hit(url: str, data):
+    if data is not None:
+        POKEAPI_REQUESTS.labels(resource_type(url), "cache").inc()
+    return data
+
+
+# Cache or snapshot lookup, returns data or None
+# refresh=True skips the cache so an entry about to expire is fetched again
+def _get_local(key: str, url: str, store: bool, refresh: bool = False, track: bool = True, memory: bool = True):
+    if not refresh:
+        if store and track and memory:
+            access_log.record(snapshot_key(url))
+        data = _cache_hit(url, cache.get(key, memory))
+        if data is not None:
+            return data
+    data = _get_snapshot(url)
+    if data is not None and store:
+        cache.set(key, data, cache_ttl(key), memory)
+    return data
+
+
+# Async variant of _get_local, shared tier I/O runs off the event loop
+async def _aget_local(key: str, url: str, store: bool, refresh: bool = False, track: bool = True,
+                      memory: bool = True):
+    if not refresh:
+        if store and track and memory:
+            access_log.record(snapshot_key(url))
+        data = _cache_hit(url, await cache.aget(key, memory))
+        if data is not None:
+            return data
+    data = _get_snapshot(url)
+    if data is not None and store:
+        await cache.aset(key, data, cache_ttl(key), memory)
+    return data
+
+
+# Negative cache lookup, returns the remembered status code or None
+def _get_negative(key: str, url: str):
+    status_code = negative_cache.get(key)
+    if status_code is not None:
+        POKEAPI_REQUESTS.labels(resource_type(url), "negative_cache").inc()
+    return status_code
+
+
+# (status_code, record) of a PokéAPI response, 404s are remembered
+def _parse_response(key: str, response: httpx.Response):
+    if response.status_code == 404:
+        negative_cache.set(key, 404)
+    if response.status_code != 200:
+        return response.status_code, None
+    POKEAPI_RESPONSE_SIZE.labels(resource_type(key)).observe(len(response.content))
+    # Only the fields the services read are kept, the full payload is dropped right after parsing
+    return 200, parse_record(resource_type(key), response.json())
+
+
+def _observe_network(url: str, start: float, response: httpx.Response):
+    resource = resource_type(url)
+    POKEAPI_REQUESTS.labels(resource, "network").inc()
+    POKEAPI_LATENCY.labels(resource, str(response.status_code)).observe(time.perf_counter() - start)
+
+
+# A timeout hit because the request budget ran out surfaces as BudgetExceeded
+def _check_budget(error: Exception):
+    left = remaining()
+    if left is not None and left <= 0:
+        raise BudgetExceeded("Request budget exhausted") from error
+
+
+# Client span of a PokéAPI network call
+def _span(url: str):
+    return tracer.start_as_current_span(
+        f"pokeapi.{resource_type(url)}", kind=SpanKind.CLIENT, attributes={"http.url": url},
+    )
+
+
+# Fetch a PokéAPI resource, returns (status_code, data)
+# data is a record from records.py for the resource types it covers, the decoded JSON otherwise
+# The timeout is capped by the remaining request budget, if there is one
+# store=False skips caching entirely
+# memory=False reads and fills only the shared tier, for bulk crawls that would flush the in-process cache
+# refresh=True bypasses the cache and negative cache to renew an entry
+# track=False keeps the lookup out of the access log, for the cache warmer's own fetches
+def get_json(url: str, timeout: float = None, store: bool = True, refresh: bool = False, track: bool = True,
+             memory: bool = True):
+    key = url.rstrip("/")
+    data = _get_local(key, url, store, refresh, track, memory)
+    if data is not None:
+        return 200, data
+    if OFFLINE:
+        return 404, None
+    status_code = _get_negative(key, url) if not refresh else None
+    if status_code is not None:
+        return status_code, None
+    request_timeout = budget_timeout(timeout or DEFAULT_TIMEOUT)
+    start = time.perf_counter()
+    with _span(url) as span, POKEAPI_IN_FLIGHT.labels(resource_type(url)).track_inprogress():
+        try:
+            response = _client.get(url, timeout=request_timeout)
+        except httpx.TimeoutException as e:
+            _check_budget(e)
+            raise
+        span.set_attribute("http.status_code", response.status_code)
+    _observe_network(url, start, response)
+    status_code, data = _parse_response(key, response)
+    if data is not None and store:
+        cache.set(key, data, cache_ttl(key), memory)
+    return status_code, data
+
+
+# Async variant of get_json using the pooled async client
+async def aget_json(url: str, timeout: float = None, store: bool = True, refresh: bool = False, track: bool = True,
+                    memory: bool = True):
+    key = url.rstrip("/")
+    data = await _aget_local(key, url, store, refresh, track, memory)
+    if data is not None:
+        return 200, data
+    if OFFLINE:
+        return 404, None
+    status_code = _get_negative(key, url) if not refresh else None
+    if status_code is not None:
+        return status_code, None
+    request_timeout = budget_timeout(timeout or DEFAULT_TIMEOUT)
+    start = time.perf_counter()
+    with _span(url) as span, POKEAPI_IN_FLIGHT.labels(resource_type(url)).track_inprogress():
+        try:
+            response = await get_async_client().get(url, timeout=request_timeout)
+        except httpx.TimeoutException as e:
+            _check_budget(e)
+            raise
+        span.set_attribute("http.status_code", response.status_code)
+    _observe_network(url, start, response)
+    status_code, data = _parse_response(key, response)
+    if data is not None and store:
+        await cache.aset(key, data, cache_ttl(key), memory)
+    return status_code, data
@@ -1,83 +1,167 @@
 # Import libraries
-import requests
-import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
-import logging
-import sys
+import asyncio
+import numpy as np
+from prometheus_client import Gauge
+from pokeapi_client import aget_json, resource_url
+from type_chart import TYPE_NAMES, get_type_chart
+from move_table import DAMAGE_CLASSES
+from damage_engine import NO_MOVE, SPEED_TIERS, Combatants, matchup, matchup_score
+from stat_table import get_stat_table, top_n_indices
+from log_setup import get_logger
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+logger = get_logger("counter")
+# One line per candidate fetch, so only a sample is kept
+fetch_logger = get_logger("counter.fetch", sample_rate=0.01)
 
+# Candidate fetches waiting for a free slot in get_ranked_counter_pokemons
+FETCH_QUEUE_DEPTH = Gauge(
+    "counter_fetch_queue_depth", "Counter candidate fetches waiting for a free fetch slot",
+)
 
-# Fetch basic stats of Pokemon
-def fetch_base_stats(pokemon_name):
+
+# Load basic stats of a Pokemon missing from the stat table
+async def fetch_base_stats(pokemon):
     try:
-        url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name}"
-        logger.info(f"Fetching base stats for Pokémon: {pokemon_name}")
-        res = requests.get(url, timeout=5)
-        if res.status_code != 200:
-            logger.warning(f"Failed to fetch stats for '{pokemon_name}', status code: {res.status_code}")
+        fetch_logger.info("Fetching base stats for Pokémon: %s", pokemon)
+        status_code, data = await aget_json(resource_url("pokemon", pokemon), timeout=5)
+        if status_code != 200:
+            fetch_logger.warning("Failed to fetch stats for '%s', status code: %s", pokemon, status_code)
             return None
-        data = res.json()
-        stats = {s["stat"]["name"]: s["base_stat"] for s in data["stats"]}
-        result = {
-            "Name": pokemon_name.capitalize(),
-            "Attack": stats.get("attack", 0),
-            "Special Attack": stats.get("special-attack", 0),
-            "Speed": stats.get("speed", 0),
-            "Total Score": stats.get("attack", 0) + stats.get("special-attack", 0) + stats.get("speed", 0)
-        }
-        logger.info(f"Fetched stats for Pokémon: {pokemon_name} -> {result}")
-        return result
+        return get_stat_table().add(data)
     except Exception as e:
-        logger.error(f"Exception while fetching base stats for '{pokemon_name}': {e}")
+        fetch_logger.error("Exception while fetching base stats for '%s': %s", pokemon, e)
         return None
 
 
-# Get counter Pokemon by rank
-def get_ranked_counter_pokemons(pokemon_name: str, top_n=10, max_workers=20):
-    logger.info(f"Getting ranked counter Pokémon for: {pokemon_name}")
-    res = requests.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}")
-    if res.status_code != 200:
-        logger.error(f"Pokémon '{pokemon_name}' not found, status code: {res.status_code}")
+# Counter results of the top_n best loaded candidates, best first, scored by the damage engine
+def rank_counters(table, defender_id: int, candidate_ids: np.ndarray, multipliers: np.ndarray, top_n: int) -> list:
+    loaded = table.has(candidate_ids)
+    candidate_ids, multipliers = candidate_ids[loaded], multipliers[loaded]
+    if not len(candidate_ids):
+        return []
+    result = matchup(Combatants(table, candidate_ids), Combatants(table, [defender_id]), get_type_chart().matrix)
+    result = {key: values[:, 0] for key, values in result.items()}
+    attack = table.column("attack")[candidate_ids].astype(np.int32)
+    special_attack = table.column("special-attack")[candidate_ids].astype(np.int32)
+    speed = table.column("speed")[candidate_ids].astype(np.int32)
+    total = attack + special_attack + speed
+    top = top_n_indices(matchup_score(result), top_n)
+    move_type, damage_class = result["move_type"], result["damage_class"]
+    return [
+        {
+            "Name": table.names[candidate_ids[i]].capitalize(),
+            "Attack": int(attack[i]),
+            "Special Attack": int(special_attack[i]),
+            "Speed": int(speed[i]),
+            "Total Score": int(total[i]),
+            "Type Multiplier": float(multipliers[i]),
+            "Best Move Type": TYPE_NAMES[move_type[i]].capitalize() if move_type[i] != NO_MOVE else None,
+            "Damage Class": DAMAGE_CLASSES[damage_class[i]].capitalize() if damage_class[i] != NO_MOVE else None,
+            "Expected Damage %": round(float(result["damage_dealt"][i]), 1),
+            "Damage Taken %": round(float(result["damage_taken"][i]), 1),
+            "Speed Tier": SPEED_TIERS[int(result["speed"][i])],
+            "Wins 1v1": bool(result["wins"][i]),
+        }
+        for i in top
+    ]
+
+
+# Rank counters progressively, yielding events as candidate stats arrive:
+# {"event": "provisional", ...} at most every refresh_every seconds (never when None),
+# then {"event": "final", ...}, or a single {"event": "error", ...} for unknown Pokémon.
+# Fetches still running after deadline seconds are cancelled and reported as dropped.
+async def stream_ranked_counter_pokemons(pokemon_name: str, top_n=10, max_workers=20,
+                                         deadline: float = None, refresh_every: float = None):
+    logger.info("Getting ranked counter Pokémon for: %s", pokemon_name)
+    loop = asyncio.get_running_loop()
+    deadline_at = loop.time() + deadline if deadline is not None else None
+    table = get_stat_table()
+    defender_id = table.lookup(pokemon_name)
+    if defender_id is None:
+        status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+        if status_code != 200:
+            logger.error("Pokémon '%s' not found, status code: %s", pokemon_name, status_code)
+            yield {
+                "event": "error",
+                "status_code": status_code,
+                "detail": f"Pokémon '{pokemon_name}' not found."
+            }
+            return
+        defender_id = table.add(data)
+    types = table.type_names(defender_id)
+    logger.info("Types for '%s': %s", pokemon_name, types)
+    # Select counters from the precomputed type chart
+    candidate_ids, multipliers = get_type_chart().counter_candidates(types, exclude_id=defender_id)
+    logger.info("Found %s potential counter Pokémon for '%s'", len(candidate_ids), pokemon_name)
+
+    def event(kind: str, dropped: int = 0) -> dict:
         return {
-            "status_code": res.status_code,
-            "detail": f"Pokémon '{pokemon_name}' not found."
+            "event": kind,
+            "candidates": len(candidate_ids),
+            "loaded": int(table.has(candidate_ids).sum()),
+            "dropped": dropped,
+            "counters": rank_counters(table, defender_id, candidate_ids, multipliers, top_n),
         }
-    types = [t["type"]["name"] for t in res.json()["types"]]
-    logger.info(f"Types for '{pokemon_name}': {types}")
-    # Get counter types
-    counter_types = set()
-    for t in types:
-        type_data = requests.get(f"https://pokeapi.co/api/v2/type/{t}").json()
-        for rel in type_data["damage_relations"]["double_damage_from"]:
-            counter_types.add(rel["name"])
-    logger.info(f"Counter types for '{pokemon_name}': {list(counter_types)}")
-    # Get Pokémon with those counter types
-    counter_pokemons = set()
-    for ct in counter_types:
-        ct_data = requests.get(f"https://pokeapi.co/api/v2/type/{ct}").json()
-        for entry in ct_data["pokemon"]:
-            poke_name = entry["pokemon"]["name"]
-            if poke_name != pokemon_name.lower():
-                counter_pokemons.add(poke_name)
-    logger.info(f"Found {len(counter_pokemons)} potential counter Pokémon for '{pokemon_name}'")
-    # Fetch all base stats concurrently
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(executor.map(fetch_base_stats, counter_pokemons))
-    results = [r for r in results if r is not None]
-    logger.info(f"Fetched base stats for {len(results)} counter Pokémon")
-    df = pd.DataFrame(results)
-    df = df.sort_values(by="Total Score", ascending=False).reset_index(drop=True)
-    top_results = df.head(top_n).to_dict(orient='records')
-    logger.info(f"Top {top_n} counter Pokémon for '{pokemon_name}': {[p['Name'] for p in top_results]}")
-    return top_results
+
+    # Only Pokémon missing from the stat table go to the network
+    missing = candidate_ids[~table.has(candidate_ids)]
+    pending = set()
+    if len(missing):
+        # Candidates already in the table give a provisional ranking straight away
+        if refresh_every is not None and len(missing) < len(candidate_ids):
+            yield event("provisional")
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch_limited(pokemon_id):
+            with FETCH_QUEUE_DEPTH.track_inprogress():
+                await semaphore.acquire()
+            try:
+                return await fetch_base_stats(pokemon_id)
+            finally:
+                semaphore.release()
+
+        pending = {asyncio.ensure_future(fetch_limited(pokemon_id)) for pokemon_id in missing.tolist()}
+        last_emit = loop.time()
+        changed = False
+        try:
+            while pending:
+                timeout = refresh_every
+                if deadline_at is not None:
+                    remaining = deadline_at - loop.time()
+                    if remaining <= 0:
+                        break
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                changed = changed or bool(done)
+                if refresh_every is not None and changed and pending and loop.time() - last_emit >= refresh_every:
+                    yield event("provisional")
+                    last_emit = loop.time()
+                    changed = False
+        finally:
+            # Stragglers past the deadline, or of an abandoned stream, are not waited on
+            for task in pending:
+                task.cancel()
+    if pending:
+        logger.warning("Deadline reached for '%s', dropped %s candidate fetches", pokemon_name, len(pending))
+    final = event("final", dropped=len(pending))
+    logger.info("Top %s counter Pokémon for '%s': %s", top_n, pokemon_name, [p['Name'] for p in final["counters"]])
+    yield final
+
+
+# Get counter Pokemon by rank
+# With a deadline, stragglers are dropped and the result is marked as partial
+async def get_ranked_counter_pokemons(pokemon_name: str, top_n=10, max_workers=20, deadline: float = None):
+    async for event in stream_ranked_counter_pokemons(pokemon_name, top_n, max_workers, deadline=deadline):
+        if event["event"] == "error":
+            return {"status_code": event["status_code"], "detail": event["detail"]}
+        if event["event"] == "final" and event["dropped"]:
+            return {
+                "partial": True,
+                "detail": "Request budget exhausted before all candidate stats arrived",
+                "candidates": event["candidates"],
+                "dropped": event["dropped"],
+                "counters": event["counters"],
+            }
+        if event["event"] == "final":
+            return event["counters"]
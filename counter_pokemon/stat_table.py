@@ -0,0 +1,167 @@
+# Import libraries
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pokeapi_client import POKEAPI_BASE_URL, get_json, resource_url, snapshot
+from type_chart import TYPE_INDEX, TYPE_NAMES, id_from_url
+from move_table import DAMAGE_CLASSES, get_move_table
+from records import Pokemon
+from log_setup import get_logger
+
+logger = get_logger()
+
+# Stat columns in PokéAPI order
+STAT_NAMES = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+STAT_INDEX = {name: i for i, name in enumerate(STAT_NAMES)}
+STAT_TABLE_PATH = os.getenv("STAT_TABLE_PATH")
+
+
+# Columnar base-stat table, rows indexed directly by Pokémon ID
+class StatTable:
+    def __init__(self, capacity: int = 0):
+        self.stats = np.zeros((len(STAT_NAMES), capacity), dtype=np.int16)
+        self.types = np.full((2, capacity), -1, dtype=np.int8)
+        self.present = np.zeros(capacity, dtype=bool)
+        # move_power[type, damage class, id] is the best learnable move power, 0 when unknown
+        self.move_power = np.zeros((len(TYPE_NAMES), len(DAMAGE_CLASSES), capacity), dtype=np.int16)
+        self.names = np.empty(capacity, dtype=object)
+        self.ids_by_name = {}
+        self._lock = threading.Lock()
+
+    def _ensure_capacity(self, pokemon_id: int):
+        capacity = self.present.shape[0]
+        if pokemon_id < capacity:
+            return
+        grown = max(pokemon_id + 1, capacity * 2)
+        pad = grown - capacity
+        self.stats = np.pad(self.stats, ((0, 0), (0, pad)))
+        self.types = np.pad(self.types, ((0, 0), (0, pad)), constant_values=-1)
+        self.present = np.pad(self.present, (0, pad))
+        self.move_power = np.pad(self.move_power, ((0, 0), (0, 0), (0, pad)))
+        self.names = np.concatenate([self.names, np.empty(pad, dtype=object)])
+
+    # Add a row from a Pokemon record
+    def add(self, pokemon: Pokemon) -> int:
+        pokemon_id = pokemon.id
+        move_power = get_move_table().best_powers(pokemon.moves)
+        with self._lock:
+            self._ensure_capacity(pokemon_id)
+            for stat_name, base_stat in pokemon.stats:
+                if stat_name in STAT_INDEX:
+                    self.stats[STAT_INDEX[stat_name], pokemon_id] = base_stat
+            for slot, type_name in enumerate(pokemon.types[:2]):
+                self.types[slot, pokemon_id] = TYPE_INDEX.get(type_name, -1)
+            self.move_power[:, :, pokemon_id] = move_power
+            self.names[pokemon_id] = pokemon.name
+            self.ids_by_name[pokemon.name] = pokemon_id
+            self.present[pokemon_id] = True
+        return pokemon_id
+
+    def __len__(self):
+        return int(self.present.sum())
+
+    # Pokémon ID for a name or numeric ID, None when not loaded
+    def lookup(self, pokemon) -> int:
+        key = str(pokemon).strip().lower()
+        if key.isdigit():
+            pokemon_id = int(key)
+            return pokemon_id if pokemon_id < self.present.shape[0] and self.present[pokemon_id] else None
+        return self.ids_by_name.get(key)
+
+    # Boolean mask of which IDs have a loaded row
+    def has(self, ids: np.ndarray) -> np.ndarray:
+        ids = np.asarray(ids)
+        mask = ids < self.present.shape[0]
+        mask[mask] = self.present[ids[mask]]
+        return mask
+
+    def column(self, stat_name: str) -> np.ndarray:
+        return self.stats[STAT_INDEX[stat_name]]
+
+    def type_names(self, pokemon_id: int) -> list:
+        return [
+            type_name
+            for type_name, idx in TYPE_INDEX.items()
+            if idx in self.types[:, pokemon_id]
+        ]
+
+    def save(self, path: str):
+        ids = np.flatnonzero(self.present)
+        np.savez_compressed(
+            path,
+            ids=ids,
+            stats=self.stats[:, ids],
+            types=self.types[:, ids],
+            move_power=self.move_power[:, :, ids],
+            names=np.asarray(self.names[ids], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as snapshot:
+            ids = snapshot["ids"]
+            table = cls(int(ids.max()) + 1 if len(ids) else 0)
+            table.stats[:, ids] = snapshot["stats"]
+            table.types[:, ids] = snapshot["types"]
+            table.present[ids] = True
+            # Tables saved before move powers were tracked load without them
+            if "move_power" in snapshot.files:
+                table.move_power[:, :, ids] = snapshot["move_power"]
+            names = snapshot["names"].tolist()
+        table.names[ids] = names
+        table.ids_by_name = dict(zip(names, ids.tolist()))
+        return table
+
+
+# Indices of the top_n highest scores, best first
+def top_n_indices(scores: np.ndarray, top_n: int) -> np.ndarray:
+    if len(scores) > top_n:
+        top = np.argpartition(-scores, top_n - 1)[:top_n]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+# Load every Pokémon from the snapshot or PokéAPI into a new table
+def build_stat_table(max_workers: int = 20) -> StatTable:
+    if snapshot is not None:
+        table = StatTable()
+        for data in snapshot.iter_kind("pokemon"):
+            table.add(Pokemon.from_payload(data))
+        logger.info("Built stat table with %s Pokémon from snapshot", len(table))
+        return table
+    status_code, listing = get_json(f"{POKEAPI_BASE_URL}/pokemon?limit=100000")
+    if status_code != 200:
+        raise RuntimeError(f"Failed to list Pokémon, status code: {status_code}")
+    ids = [id_from_url(entry["url"]) for entry in listing["results"]]
+    table = StatTable(max(ids) + 1 if ids else 0)
+
+    def load_row(pokemon_id):
+        status_code, data = get_json(resource_url("pokemon", pokemon_id), timeout=5, store=False)
+        if status_code == 200:
+            table.add(data)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(load_row, ids))
+    logger.info("Built stat table with %s Pokémon", len(table))
+    return table
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+# Process-wide stat table, loaded from snapshot or crawled once
+def get_stat_table() -> StatTable:
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                if STAT_TABLE_PATH and os.path.exists(STAT_TABLE_PATH):
+                    _table = StatTable.load(STAT_TABLE_PATH)
+                else:
+                    _table = build_stat_table()
+                    if STAT_TABLE_PATH:
+                        _table.save(STAT_TABLE_PATH)
+    return _table
@@ -0,0 +1,71 @@
+# Import libraries
+import asyncio
+import numpy as np
+from pokeapi_client import aget_json, resource_url
+from type_chart import TYPE_NAMES, get_type_chart
+from stat_table import get_stat_table
+from damage_engine import NO_MOVE, Combatants, matchup, matchup_score, type_effectiveness
+from log_setup import get_logger
+
+# Logger setup
+logger = get_logger("counter")
+
+
+# Stat table IDs of the given names, fetching each distinct missing Pokémon once.
+# Returns (ids by name, names not found)
+async def resolve_pokemon(names: list):
+    table = get_stat_table()
+    ids = {name: table.lookup(name) for name in dict.fromkeys(names)}
+    missing = [name for name, pokemon_id in ids.items() if pokemon_id is None]
+    responses = await asyncio.gather(*(aget_json(resource_url("pokemon", name)) for name in missing))
+    not_found = []
+    for name, (status_code, data) in zip(missing, responses):
+        if status_code == 200:
+            ids[name] = table.add(data)
+        else:
+            not_found.append(name)
+    return ids, not_found
+
+
+# All-pairs matchup of two rosters in one pass, every matrix indexed [team1 member][team2 member]
+async def get_matchup_matrix(team1: list, team2: list):
+    team1 = [name.strip().lower() for name in team1]
+    team2 = [name.strip().lower() for name in team2]
+    logger.info("Scoring matchup matrix of %s vs %s", team1, team2)
+    ids, not_found = await resolve_pokemon(team1 + team2)
+    if not_found:
+        return {"status_code": 404, "detail": f"Pokémon not found: {', '.join(not_found)}"}
+    table = get_stat_table()
+    attackers = Combatants(table, [ids[name] for name in team1])
+    defenders = Combatants(table, [ids[name] for name in team2])
+    matrix = get_type_chart().matrix
+    result = matchup(attackers, defenders, matrix)
+    # Multiplier of each best move against its target, 0 where no move does damage
+    move_type = result["move_type"]
+    no_move = move_type == NO_MOVE
+    effectiveness = type_effectiveness(matrix, defenders.types)[np.where(no_move, 0, move_type), np.arange(len(team2))[None, :]]
+    effectiveness[no_move] = 0
+    score = matchup_score(result)
+    # Pairs the team2 member wins, by the same rule seen from its side
+    losses = (result["turns_to_be_ko"] < result["turns_to_ko"]) | (
+        (result["turns_to_be_ko"] == result["turns_to_ko"]) & (result["speed"] < 0) & np.isfinite(result["turns_to_be_ko"])
+    )
+    names1 = [table.names[ids[name]].capitalize() for name in team1]
+    names2 = [table.names[ids[name]].capitalize() for name in team2]
+    return {
+        "team1": names1,
+        "team2": names2,
+        "effectiveness": effectiveness.tolist(),
+        "best_move_type": [[TYPE_NAMES[t].capitalize() if t != NO_MOVE else None for t in row] for row in move_type.tolist()],
+        # Rounded in float64, float32 values would serialize as e.g. 63.79999923706055
+        "damage_dealt": np.round(result["damage_dealt"].astype(np.float64), 1).tolist(),
+        "damage_taken": np.round(result["damage_taken"].astype(np.float64), 1).tolist(),
+        "speed": result["speed"].tolist(),
+        "wins": result["wins"].tolist(),
+        # Aligned with the rosters, so a Pokémon listed twice keeps one entry per slot
+        "summary": {
+            "team1_wins": result["wins"].sum(axis=1).tolist(),
+            "team2_wins": losses.sum(axis=0).tolist(),
+            "best_answer": [names1[i] for i in score.argmax(axis=0).tolist()],
+        },
+    }
@@ -0,0 +1,45 @@
+# Service modules import each other by bare name, so tests run with the service directory on the path
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from type_chart import TYPE_INDEX, TYPE_NAMES  # noqa: E402
+from move_table import DAMAGE_CLASSES  # noqa: E402
+from stat_table import StatTable  # noqa: E402
+
+
+# Type matrix with only the entries a test names, e.g. {("normal", "ghost"): 0}
+def make_matrix(factors: dict) -> np.ndarray:
+    matrix = np.ones((len(TYPE_NAMES), len(TYPE_NAMES)), dtype=np.float32)
+    for (attacker, defender), factor in factors.items():
+        matrix[TYPE_INDEX[attacker], TYPE_INDEX[defender]] = factor
+    return matrix
+
+
+# Stat table filled in place, without the move table lookups StatTable.add does.
+# Each row is (name, base stats in STAT_NAMES order, types, {(move type, damage class): power})
+def make_table(rows: list) -> StatTable:
+    table = StatTable(len(rows) + 1)
+    for pokemon_id, (name, stats, types, moves) in enumerate(rows, start=1):
+        table.stats[:, pokemon_id] = stats
+        for slot, type_name in enumerate(types):
+            table.types[slot, pokemon_id] = TYPE_INDEX[type_name]
+        for (type_name, damage_class), power in moves.items():
+            table.move_power[TYPE_INDEX[type_name], DAMAGE_CLASSES.index(damage_class), pokemon_id] = power
+        table.names[pokemon_id] = name
+        table.ids_by_name[name] = pokemon_id
+        table.present[pokemon_id] = True
+    return table
+
+
+@pytest.fixture
+def matrix_factory():
+    return make_matrix
+
+
+@pytest.fixture
+def table_factory():
+    return make_table
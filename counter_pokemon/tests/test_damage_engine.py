@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from damage_engine import NO_MOVE, Combatants, best_damage, matchup, matchup_score
+from move_table import DAMAGE_CLASSES
+from type_chart import TYPE_INDEX
+
+FLAT = (100, 100, 100, 100, 100, 100)
+
+
+def test_damage_formula_applies_stab_and_effectiveness(table_factory, matrix_factory):
+    table = table_factory([
+        ("squirtle", FLAT, ["water"], {("water", "physical"): 80}),
+        ("charmander", FLAT, ["fire"], {}),
+    ])
+    matrix = matrix_factory({("water", "fire"): 2})
+    damage, move_type, damage_class = best_damage(Combatants(table, [1]), Combatants(table, [2]), matrix)
+    # ((2 * 50 / 5 + 2) * 80 * 120 / 120 / 50 + 2) * 1.5 STAB * 2 effectiveness, over 175 HP
+    assert damage[0, 0] == pytest.approx(111.6 / 175 * 100, rel=1e-5)
+    assert move_type[0, 0] == TYPE_INDEX["water"]
+    assert DAMAGE_CLASSES[damage_class[0, 0]] == "physical"
+
+
+def test_stab_can_beat_a_stronger_off_type_move(table_factory, matrix_factory):
+    table = table_factory([
+        ("pikachu", FLAT, ["electric"], {("electric", "special"): 80, ("normal", "special"): 100}),
+        ("snorlax", FLAT, ["normal"], {}),
+    ])
+    _, move_type, damage_class = best_damage(Combatants(table, [1]), Combatants(table, [2]), matrix_factory({}))
+    assert move_type[0, 0] == TYPE_INDEX["electric"]
+    assert DAMAGE_CLASSES[damage_class[0, 0]] == "special"
+
+
+def test_immune_pair_reports_no_move(table_factory, matrix_factory):
+    table = table_factory([
+        ("snorlax", FLAT, ["normal"], {("normal", "physical"): 85}),
+        ("gengar", FLAT, ["ghost"], {("ghost", "special"): 80}),
+    ])
+    matrix = matrix_factory({("normal", "ghost"): 0, ("ghost", "normal"): 0})
+    damage, move_type, damage_class = best_damage(Combatants(table, [1]), Combatants(table, [2]), matrix)
+    assert damage[0, 0] == 0
+    assert move_type[0, 0] == NO_MOVE
+    assert damage_class[0, 0] == NO_MOVE
+
+    result = matchup(Combatants(table, [1]), Combatants(table, [2]), matrix)
+    assert np.isinf(result["turns_to_ko"][0, 0])
+    assert not result["wins"][0, 0]
+
+
+def test_unknown_learnset_gets_default_same_type_moves(table_factory, matrix_factory):
+    table = table_factory([
+        ("mew", FLAT, ["psychic"], {}),
+        ("mewtwo", FLAT, ["psychic"], {}),
+    ])
+    damage, move_type, _ = best_damage(Combatants(table, [1]), Combatants(table, [2]), matrix_factory({}))
+    assert damage[0, 0] > 0
+    assert move_type[0, 0] == TYPE_INDEX["psychic"]
+
+
+def test_matchup_score_ranks_wins_before_damage_margin():
+    result = {
+        "wins": np.array([False, True, True, False]),
+        "damage_dealt": np.array([900.0, 40.0, 80.0, 60.0], dtype=np.float32),
+        "damage_taken": np.array([10.0, 30.0, 30.0, 50.0], dtype=np.float32),
+    }
+    score = matchup_score(result)
+    # Wins first, then dealt minus taken; a one-sided loss still trails every win
+    assert np.argsort(-score, kind="stable").tolist() == [2, 1, 0, 3]
+
+
+def test_matchup_score_clips_the_margin_below_a_win():
+    result = {
+        "wins": np.array([False, True]),
+        "damage_dealt": np.array([np.inf, 1.0], dtype=np.float32),
+        "damage_taken": np.array([0.0, np.inf], dtype=np.float32),
+    }
+    score = matchup_score(result)
+    assert score[1] > score[0]
+    assert np.isfinite(score).all()
+
+
+def test_counters_rank_by_matchup_score(table_factory, matrix_factory):
+    table = table_factory([
+        ("gengar", FLAT, ["ghost"], {("ghost", "special"): 80}),
+        ("houndoom", FLAT, ["dark"], {("dark", "special"): 80}),
+        ("tyranitar", (100, 134, 110, 95, 100, 61), ["dark"], {("dark", "physical"): 80}),
+        ("snorlax", FLAT, ["normal"], {("normal", "physical"): 85}),
+    ])
+    matrix = matrix_factory({("normal", "ghost"): 0, ("ghost", "normal"): 0, ("dark", "ghost"): 2, ("ghost", "dark"): 0.5})
+    score = matchup_score(matchup(Combatants(table, [2, 3, 4]), Combatants(table, [1]), matrix))[:, 0]
+    assert np.argsort(-score, kind="stable").tolist() == [1, 0, 2]
@@ -0,0 +1,21 @@
+import numpy as np
+import pokemon_counter
+from type_chart import TypeChart
+
+FLAT = (100, 100, 100, 100, 100, 100)
+
+
+def test_rank_counters_reports_no_move_against_an_immune_defender(monkeypatch, table_factory, matrix_factory):
+    table = table_factory([
+        ("gengar", FLAT, ["ghost"], {}),
+        ("snorlax", FLAT, ["normal"], {("normal", "physical"): 85}),
+        ("houndoom", FLAT, ["dark"], {("dark", "special"): 80}),
+    ])
+    matrix = matrix_factory({("normal", "ghost"): 0, ("dark", "ghost"): 2})
+    monkeypatch.setattr(pokemon_counter, "get_type_chart", lambda: TypeChart(matrix, [], {}))
+    ranked = pokemon_counter.rank_counters(table, 1, np.array([2, 3]), np.array([1.0, 2.0]), top_n=10)
+    assert [entry["Name"] for entry in ranked] == ["Houndoom", "Snorlax"]
+    assert ranked[0]["Best Move Type"] == "Dark"
+    assert ranked[1]["Best Move Type"] is None
+    assert ranked[1]["Damage Class"] is None
+    assert ranked[1]["Expected Damage %"] == 0
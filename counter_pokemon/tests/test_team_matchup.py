@@ -0,0 +1,24 @@
+import asyncio
+import team_matchup
+from type_chart import TypeChart
+
+FLAT = (100, 100, 100, 100, 100, 100)
+
+
+def test_matchup_matrix_masks_pairs_without_damage(monkeypatch, table_factory, matrix_factory):
+    table = table_factory([
+        ("snorlax", FLAT, ["normal"], {("normal", "physical"): 85}),
+        ("gengar", FLAT, ["ghost"], {("ghost", "special"): 80}),
+        ("squirtle", FLAT, ["water"], {}),
+    ])
+    matrix = matrix_factory({("normal", "ghost"): 0, ("ghost", "normal"): 0})
+    monkeypatch.setattr(team_matchup, "get_stat_table", lambda: table)
+    monkeypatch.setattr(team_matchup, "get_type_chart", lambda: TypeChart(matrix, [], {}))
+    result = asyncio.run(team_matchup.get_matchup_matrix(["Snorlax "], ["gengar", "squirtle"]))
+    assert result["best_move_type"] == [[None, "Normal"]]
+    assert result["effectiveness"] == [[0, 1]]
+    assert result["damage_dealt"][0][0] == 0
+    # Rounded values serialize with one decimal, not float32 noise
+    assert all(value == round(value, 1) for value in result["damage_dealt"][0] + result["damage_taken"][0])
+    assert result["summary"]["team1_wins"] == [1]
+    assert result["summary"]["team2_wins"] == [0, 0]
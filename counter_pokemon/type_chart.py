@@ -0,0 +1,123 @@
+# Import libraries
+import json
+import os
+import threading
+import numpy as np
+from pokeapi_client import get_json, resource_url
+
+# Attacking/defending types in matrix order
+TYPE_NAMES = (
+    "normal", "fire", "water", "electric", "grass", "ice",
+    "fighting", "poison", "ground", "flying", "psychic", "bug",
+    "rock", "ghost", "dragon", "dark", "steel", "fairy",
+)
+TYPE_INDEX = {name: i for i, name in enumerate(TYPE_NAMES)}
+TYPE_CHART_PATH = os.getenv("TYPE_CHART_PATH")
+
+_DAMAGE_FACTORS = {
+    "double_damage_to": 2.0,
+    "half_damage_to": 0.5,
+    "no_damage_to": 0.0,
+}
+
+
+# Pokémon ID embedded in a PokéAPI resource URL
+def id_from_url(url: str) -> int:
+    return int(url.rstrip("/").rsplit("/", 1)[-1])
+
+
+# Type effectiveness matrix and type -> Pokémon index
+class TypeChart:
+    def __init__(self, matrix: np.ndarray, pokemon_by_type: list, pokemon_names: dict):
+        # matrix[attacker, defender] is the damage multiplier
+        self.matrix = matrix
+        # pokemon_by_type[type index] is a sorted int32 array of Pokémon IDs
+        self.pokemon_by_type = pokemon_by_type
+        self.pokemon_names = pokemon_names
+
+    # Combined multiplier of every attacking type against a defender's types
+    def attack_multipliers(self, defender_types) -> np.ndarray:
+        columns = [TYPE_INDEX[t] for t in defender_types if t in TYPE_INDEX]
+        return self.matrix[:, columns].prod(axis=1)
+
+    # Pokémon with a super-effective type and their best multiplier
+    def counter_candidates(self, defender_types, exclude_id: int = None):
+        multipliers = self.attack_multipliers(defender_types)
+        max_id = max((int(ids[-1]) for ids in self.pokemon_by_type if len(ids)), default=0)
+        best = np.zeros(max_id + 1, dtype=np.float32)
+        for type_idx in np.flatnonzero(multipliers > 1):
+            ids = self.pokemon_by_type[type_idx]
+            best[ids] = np.maximum(best[ids], multipliers[type_idx])
+        if exclude_id is not None and exclude_id <= max_id:
+            best[exclude_id] = 0
+        candidate_ids = np.flatnonzero(best > 1)
+        return candidate_ids, best[candidate_ids]
+
+    def to_dict(self):
+        return {
+            "types": list(TYPE_NAMES),
+            "matrix": self.matrix.tolist(),
+            "pokemon_by_type": [ids.tolist() for ids in self.pokemon_by_type],
+            "pokemon_names": {str(k): v for k, v in self.pokemon_names.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if list(data["types"]) != list(TYPE_NAMES):
+            raise ValueError("Type chart snapshot uses a different type order")
+        return cls(
+            np.asarray(data["matrix"], dtype=np.float32),
+            [np.asarray(ids, dtype=np.int32) for ids in data["pokemon_by_type"]],
+            {int(k): v for k, v in data["pokemon_names"].items()},
+        )
+
+
+# Build the type chart from PokéAPI /type resources
+def build_type_chart() -> TypeChart:
+    matrix = np.ones((len(TYPE_NAMES), len(TYPE_NAMES)), dtype=np.float32)
+    pokemon_by_type = []
+    pokemon_names = {}
+    for attacker, type_name in enumerate(TYPE_NAMES):
+        status_code, data = get_json(resource_url("type", type_name))
+        if status_code != 200:
+            raise RuntimeError(f"Failed to fetch type '{type_name}', status code: {status_code}")
+        for relation, factor in _DAMAGE_FACTORS.items():
+            for target in data.damage_relations[relation]:
+                if target in TYPE_INDEX:
+                    matrix[attacker, TYPE_INDEX[target]] = factor
+        ids = []
+        for name, url in data.pokemon:
+            pokemon_id = id_from_url(url)
+            pokemon_names[pokemon_id] = name
+            ids.append(pokemon_id)
+        pokemon_by_type.append(np.unique(np.asarray(ids, dtype=np.int32)))
+    return TypeChart(matrix, pokemon_by_type, pokemon_names)
+
+
+def save_type_chart(chart: TypeChart, path: str):
+    with open(path, "w") as f:
+        json.dump(chart.to_dict(), f, separators=(",", ":"))
+
+
+def load_type_chart(path: str) -> TypeChart:
+    with open(path) as f:
+        return TypeChart.from_dict(json.load(f))
+
+
+_chart = None
+_chart_lock = threading.Lock()
+
+
+# Process-wide type chart, loaded from snapshot or built once
+def get_type_chart() -> TypeChart:
+    global _chart
+    if _chart is None:
+        with _chart_lock:
+            if _chart is None:
+                if TYPE_CHART_PATH and os.path.exists(TYPE_CHART_PATH):
+                    _chart = load_type_chart(TYPE_CHART_PATH)
+                else:
+                    _chart = build_type_chart()
+                    if TYPE_CHART_PATH:
+                        save_type_chart(_chart, TYPE_CHART_PATH)
+    return _chart
@@ -6,6 +6,7 @@ set -e
 NAMESPACE="pokemon"
 SERVICE_NAME="pokemon-mcp-service"
 DNS_NAME="pokemon-mcp-server"
+SNAPSHOT_FILE="data/pokeapi.sqlite3"
 
 # === Folders and Docker tags ===
 declare -A SERVICES=(
@@ -15,11 +16,20 @@ declare -A SERVICES=(
   [pokemon_mcp_server]="pokemon-mcp-app:latest"
 )
 
+echo "🗄️ Applying the shared PokéAPI cache deployment..."
+kubectl apply -f shared_cache/deployments.yaml
+
 echo "🔧 Building Docker images and applying deployments..."
 for folder in "${!SERVICES[@]}"; do
   echo "📦 Processing $folder..."
   cd "$folder" || { echo "❌ Folder $folder not found"; exit 1; }
 
+  if [[ -f "../$SNAPSHOT_FILE" && "$folder" != "pokemon_mcp_server" ]]; then
+    echo "🗃️ Bundling PokéAPI snapshot into $folder/data..."
+    mkdir -p data
+    cp "../$SNAPSHOT_FILE" data/pokeapi.sqlite3
+  fi
+
   echo "🛠️ Building image ${SERVICES[$folder]}..."
   docker build -t "${SERVICES[$folder]}" -f meta/Dockerfile .
 
@@ -0,0 +1,123 @@
+# Import libraries
+import argparse
+import json
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from log_setup import get_logger
+
+# Logger setup
+logger = get_logger()
+
+# Resources crawled into the snapshot
+RESOURCES = ("type", "ability", "move", "pokemon-species", "evolution-chain", "pokemon")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    resource_id INTEGER NOT NULL,
+    name TEXT,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resources_kind ON resources (kind, resource_id);
+CREATE TABLE IF NOT EXISTS paths (
+    path TEXT PRIMARY KEY,
+    resource INTEGER NOT NULL REFERENCES resources (id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_session = requests.Session()
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+
+
+# GET a PokéAPI URL with a few retries
+def fetch(url: str, retries: int = 3):
+    for attempt in range(retries):
+        try:
+            response = _session.get(url, timeout=30)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 404:
+                return None
+        except requests.RequestException as e:
+            logger.warning("Error fetching %s: %s", url, e)
+        time.sleep(2 ** attempt)
+    raise RuntimeError(f"Giving up on {url}")
+
+
+def compress(data) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode(), 6)
+
+
+# Crawl one resource kind and store it with id and name paths
+def crawl_resource(conn, base_url: str, kind: str, workers: int) -> int:
+    listing = fetch(f"{base_url}/{kind}?limit=100000")
+    urls = [entry["url"] for entry in listing["results"]]
+    logger.info("Crawling %s '%s' resources", len(urls), kind)
+    conn.execute(
+        "INSERT INTO resources (kind, resource_id, name, body) VALUES (?, 0, NULL, ?)",
+        (f"{kind}-list", compress(listing)),
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO paths (path, resource) VALUES (?, last_insert_rowid())", (kind,)
+    )
+    stored = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for data in executor.map(fetch, urls):
+            if data is None:
+                continue
+            cursor = conn.execute(
+                "INSERT INTO resources (kind, resource_id, name, body) VALUES (?, ?, ?, ?)",
+                (kind, data["id"], data.get("name"), compress(data)),
+            )
+            paths = [f"{kind}/{data['id']}"]
+            if data.get("name"):
+                paths.append(f"{kind}/{data['name'].lower()}")
+            conn.executemany(
+                "INSERT OR REPLACE INTO paths (path, resource) VALUES (?, ?)",
+                [(path, cursor.lastrowid) for path in paths],
+            )
+            stored += 1
+    conn.commit()
+    return stored
+
+
+def build_snapshot(output: str, base_url: str, workers: int, resources=RESOURCES):
+    tmp_output = f"{output}.tmp"
+    if os.path.exists(tmp_output):
+        os.remove(tmp_output)
+    conn = sqlite3.connect(tmp_output)
+    conn.executescript(SCHEMA)
+    total = 0
+    for kind in resources:
+        total += crawl_resource(conn, base_url, kind, workers)
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [
+            ("created_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())),
+            ("base_url", base_url),
+            ("resource_count", str(total)),
+        ],
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_output, output)
+    logger.info("Wrote %s resources to %s", total, output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl PokéAPI into a local SQLite snapshot.")
+    parser.add_argument("--output", default="data/pokeapi.sqlite3")
+    parser.add_argument("--base-url", default="https://pokeapi.co/api/v2")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--resources", nargs="+", default=list(RESOURCES), choices=RESOURCES)
+    args = parser.parse_args()
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    build_snapshot(args.output, args.base_url.rstrip("/"), args.workers, args.resources)
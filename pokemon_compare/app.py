@@ -1,28 +1,50 @@
 # Import libraries
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pokemon_compare import * 
-import logging
-import sys
+from pokeapi_client import cache, close_async_client, negative_cache, snapshot
+from metrics import install_metrics
+from tracing import install_tracing
+from cache_warmer import install_cache_warmer
+from fast_json import FastJSONResponse, RenderedResponses
+from deadline import install_deadline
+from evolution_graph import graph
+from log_setup import get_logger
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+logger = get_logger()
 
-app = FastAPI(title="Pokémon Comparison API")
+app = FastAPI(title="Pokémon Comparison API", default_response_class=FastJSONResponse)
+
+# Serialized complete comparisons of recently compared names, partial ones are never kept
+rendered = RenderedResponses()
+
+install_metrics(app, {"response": cache, "negative": negative_cache, "rendered": rendered})
+install_tracing(app, "pokemon-compare")
+install_cache_warmer(app)
+install_deadline(app)
+
+# Largest team accepted by the batch comparison
+MAX_TEAM_SIZE = 24
+
+
+# Fill the evolution graph from the local snapshot, if there is one
+@app.on_event("startup")
+async def load_evolution_graph():
+    if snapshot is not None:
+        count = graph.load(snapshot.iter_kind("evolution-chain"))
+        logger.info("Loaded %s evolution chains from snapshot", count)
+
+
+# Release pooled PokéAPI connections on shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await close_async_client()
 
 
 # ENtrypoint of the app
 @app.get("/")
-def root():
+async def root():
     logger.info("Root endpoint '/' called.")
     return {"message": "Welcome to the Pokémon Comparison API"}
 
@@ -35,15 +57,64 @@ class CompareRequest(BaseModel):
 
 # Endpoint to compare two pokemons
 @app.post("/pokemon-compare/")
-def compare(req: CompareRequest):
-    logger.info(f"POST /pokemon-compare/ called with: {req.pokemon_name1} vs {req.pokemon_name2}")
+async def compare(req: CompareRequest):
+    logger.info("POST /pokemon-compare/ called with: %s vs %s", req.pokemon_name1, req.pokemon_name2)
+    # One normalized form for both the rendered key and the lookups
+    name1, name2 = req.pokemon_name1.strip().lower(), req.pokemon_name2.strip().lower()
+    key = f"pokemon-compare/{name1}/{name2}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
     try:
-        result = compare_pokemons(req.pokemon_name1, req.pokemon_name2)
+        result = await compare_pokemons(name1, name2)
         if not result:
-            logger.warning(f"No comparison data found for {req.pokemon_name1} and {req.pokemon_name2}")
+            logger.warning("No comparison data found for %s and %s", req.pokemon_name1, req.pokemon_name2)
             raise HTTPException(status_code=404, detail="Comparison data not found")
-        logger.info(f"Comparison successful between {req.pokemon_name1} and {req.pokemon_name2}")
-        return result
+        if isinstance(result, dict) and "status_code" in result:
+            logger.warning("Comparison failed: %s", result['detail'])
+            raise HTTPException(status_code=result["status_code"], detail=result["detail"])
+        logger.info("Comparison successful between %s and %s", req.pokemon_name1, req.pokemon_name2)
+        if isinstance(result, dict):
+            return FastJSONResponse(result)
+        return rendered.render(key, result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error during comparison: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Format of batch request body
+class TeamCompareRequest(BaseModel):
+    pokemon_names: list[str] = Field(min_length=2, max_length=MAX_TEAM_SIZE)
+
+
+# Endpoint to compare a team of pokemons
+@app.post("/pokemon-compare-batch/")
+async def compare_batch(req: TeamCompareRequest):
+    logger.info("POST /pokemon-compare-batch/ called with: %s", req.pokemon_names)
+    names = [name.strip().lower() for name in req.pokemon_names]
+    key = f"pokemon-compare-batch/{','.join(names)}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
+    try:
+        result = await compare_pokemon_team(names)
+        if "status_code" in result:
+            logger.warning("Team comparison failed: %s", result['detail'])
+            raise HTTPException(status_code=result["status_code"], detail=result["detail"])
+        logger.info("Team comparison successful for %s", result['names'])
+        if result.get("partial"):
+            return FastJSONResponse(result)
+        return rendered.render(key, result)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error during comparison: {str(e)}")
+        logger.error("Error during team comparison: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# Endpoint to get PokéAPI response and negative cache counters
+@app.get("/cache-stats")
+async def cache_stats():
+    return {**cache.stats(), "negative": negative_cache.stats(), "rendered": rendered.stats()}
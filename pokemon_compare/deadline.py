@@ -0,0 +1,77 @@
+# Import libraries
+import asyncio
+import contextvars
+import time
+from starlette.requests import Request
+from log_setup import get_logger
+
+logger = get_logger()
+
+# Header carrying the caller's remaining latency budget in milliseconds
+BUDGET_HEADER = "X-Request-Budget-Ms"
+
+# Monotonic time the current request has to be answered by, None without a budget
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+# Raised by calls started after the request budget ran out
+class BudgetExceeded(Exception):
+    pass
+
+
+# Seconds left of the current request's budget, None without a budget
+def remaining():
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+# Timeout of one call within the current budget, at most `timeout`
+def budget_timeout(timeout: float) -> float:
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise BudgetExceeded("Request budget exhausted")
+    return min(timeout, left)
+
+
+# Run coroutines concurrently until the budget runs out, cancelling the rest.
+# Returns their results in order, None for those cut off, and the indices cut off
+async def gather_within_budget(*aws):
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    left = remaining()
+    _, pending = await asyncio.wait(tasks, timeout=max(left, 0) if left is not None else None)
+    for task in pending:
+        task.cancel()
+    results, cut_off = [], []
+    for i, task in enumerate(tasks):
+        if task in pending or isinstance(task.exception(), BudgetExceeded):
+            results.append(None)
+            cut_off.append(i)
+        else:
+            results.append(task.result())
+    return results, cut_off
+
+
+# Budget header value in seconds, None when missing or malformed
+def parse_budget(value: str):
+    if value is None:
+        return None
+    try:
+        return float(value) / 1000
+    except ValueError:
+        logger.warning("Ignoring malformed %s header: %s", BUDGET_HEADER, value)
+        return None
+
+
+# Read each request's budget header into its deadline
+def install_deadline(app):
+    @app.middleware("http")
+    async def request_budget(request: Request, call_next):
+        budget = parse_budget(request.headers.get(BUDGET_HEADER))
+        token = _deadline.set(time.monotonic() + budget) if budget is not None else None
+        try:
+            return await call_next(request)
+        finally:
+            if token is not None:
+                _deadline.reset(token)
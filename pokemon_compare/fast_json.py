@@ -0,0 +1,58 @@
+# Import libraries
+import json
+import os
+from fastapi.responses import JSONResponse, Response
+from pokeapi_cache import ResponseCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Serialized bodies kept for hot keys, expiring well before the PokéAPI data behind them
+RENDERED_CACHE_SIZE = int(os.getenv("RENDERED_CACHE_SIZE", "1024"))
+RENDERED_CACHE_TTL = float(os.getenv("RENDERED_CACHE_TTL", "300"))
+
+
+def _default(value):
+    # NumPy scalars and arrays
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Compact JSON bytes of a response body, with orjson when it is installed
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+# JSON response rendered by dumps. Endpoints return it directly so FastAPI skips re-encoding the body
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# Serialized response bodies by key, e.g. "pokemon-info/pikachu"
+class RenderedResponses:
+    def __init__(self, max_size: int = RENDERED_CACHE_SIZE, ttl: float = RENDERED_CACHE_TTL):
+        self.cache = ResponseCache(max_size=max_size, ttl=ttl)
+
+    # Cached serialized body of a key, None on a miss
+    def body(self, key: str):
+        return self.cache.get(key)
+
+    # Cached response of a key, None on a miss
+    def get(self, key: str):
+        body = self.body(key)
+        return Response(body, media_type="application/json") if body is not None else None
+
+    # Serialize a body once, keep the bytes and respond with them
+    def render(self, key: str, content) -> Response:
+        body = dumps(content)
+        self.cache.set(key, body)
+        return Response(body, media_type="application/json")
+
+    def stats(self):
+        return self.cache.stats()
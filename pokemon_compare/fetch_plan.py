@@ -0,0 +1,28 @@
+# Import libraries
+import asyncio
+from pokeapi_client import aget_json
+
+
+# Request-scoped fetcher that requests each distinct resource URL once
+class FetchPlan:
+    def __init__(self, fetch=aget_json):
+        self._fetch = fetch
+        self._tasks = {}
+
+    # Shared task for a URL, started on first use
+    def get(self, url: str) -> asyncio.Task:
+        key = url.rstrip("/")
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url))
+            self._tasks[key] = task
+        return task
+
+    # Cancel fetches still running, e.g. once the request budget is spent
+    def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+
+    @property
+    def fetch_count(self) -> int:
+        return len(self._tasks)
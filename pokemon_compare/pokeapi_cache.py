@@ -0,0 +1,408 @@
+# Import libraries
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+
+# Prefix of every key this cache writes to a shared tier
+KEY_PREFIX = "pokeapi"
+# Seconds the shared tier is skipped after an error, so an outage does not slow every lookup
+BACKEND_RETRY_AFTER = 30
+
+
+# Shared cache tier behind the in-process LRU, seen by every replica and service using it
+class CacheBackend(ABC):
+    name = "none"
+
+    # Returns (value, seconds left) or None when missing or expired
+    @abstractmethod
+    def get(self, key: str):
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value, ttl: float):
+        ...
+
+    # Seconds left before a key expires, None when missing or expired
+    @abstractmethod
+    def expires_in(self, key: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+
+# SQLite cache tier on local disk or a volume shared by the replicas of one node
+class SQLiteBackend(CacheBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, body TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, body = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(body), expires_at - now
+
+    def set(self, key: str, value, ttl: float):
+        body = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, expires_at, body) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, body),
+            )
+            self._conn.commit()
+
+    def expires_in(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+        remaining = row[0] - time.time() if row is not None else 0
+        return remaining if remaining > 0 else None
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+# Cache tier on a Redis-protocol server shared by all replicas and services, expiry left to the server.
+# Takes a redis-py compatible client, or builds one from a redis:// URL
+class RedisBackend(CacheBackend):
+    name = "redis"
+
+    def __init__(self, url: str = None, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("The redis cache backend needs the 'redis' package") from e
+            client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self._client = client
+
+    def get(self, key: str):
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.get(key)
+        pipeline.pttl(key)
+        body, ttl_ms = pipeline.execute()
+        if body is None or ttl_ms == -2:
+            return None
+        # -1 means the key has no expiry
+        return json.loads(body), ttl_ms / 1000 if ttl_ms >= 0 else float("inf")
+
+    def set(self, key: str, value, ttl: float):
+        body = json.dumps(value, separators=(",", ":"))
+        self._client.set(key, body, px=max(int(ttl * 1000), 1))
+
+    def expires_in(self, key: str):
+        ttl_ms = self._client.pttl(key)
+        if ttl_ms == -2:
+            return None
+        return ttl_ms / 1000 if ttl_ms >= 0 else float("inf")
+
+    # Only this cache's keys are removed, other data on the server is left alone
+    def clear(self):
+        keys = list(self._client.scan_iter(match=f"{KEY_PREFIX}:*", count=1000))
+        for i in range(0, len(keys), 1000):
+            self._client.delete(*keys[i:i + 1000])
+
+
+# Shared cache tier from settings: "redis" with a URL, "sqlite" with a path, otherwise none
+def create_backend(kind: str = None, redis_url: str = None, sqlite_path: str = None):
+    kind = (kind or ("redis" if redis_url else "sqlite" if sqlite_path else "none")).lower()
+    if kind == "redis":
+        return RedisBackend(redis_url or "redis://localhost:6379/0")
+    if kind == "sqlite":
+        if not sqlite_path:
+            raise ValueError("The sqlite cache backend needs a path")
+        return SQLiteBackend(sqlite_path)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+# In-process LRU cache with per-key TTL, backed by an optional shared tier.
+# Shared tier keys carry the version, so a format change never reads old entries.
+# encode(value) gives what the shared tier stores and decode(key, stored) turns it back into a value,
+# so memory can hold objects while the shared tier holds JSON
+class ResponseCache:
+    def __init__(self, max_size: int = 2048, ttl: float = 86400, backend: CacheBackend = None, version: str = "1",
+                 encode=None, decode=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = version
+        self._encode = encode or (lambda value: value)
+        self._decode = decode or (lambda key, stored: stored)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._backend = backend
+        self._backend_retry_at = 0.0
+        self.hits = 0
+        self.shared_hits = 0
+        self.shared_errors = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _store(self, key: str, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _shared_key(self, key: str) -> str:
+        return f"{KEY_PREFIX}:v{self.version}:{key}"
+
+    def _backend_available(self) -> bool:
+        return self._backend is not None and time.monotonic() >= self._backend_retry_at
+
+    def _backend_failed(self):
+        with self._lock:
+            self.shared_errors += 1
+            self._backend_retry_at = time.monotonic() + BACKEND_RETRY_AFTER
+
+    # In-process lookup, None on a miss
+    def _get_memory(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+        return None
+
+    # Shared tier lookup, a hit is kept in memory for what is left of its TTL unless memory=False
+    def _get_shared(self, key: str, memory: bool = True):
+        if not self._backend_available():
+            return None
+        # A shared tier outage degrades to a miss, never to a failed lookup
+        try:
+            found = self._backend.get(self._shared_key(key))
+        except Exception:
+            self._backend_failed()
+            return None
+        if found is None:
+            return None
+        stored, remaining = found
+        value = self._decode(key, stored)
+        with self._lock:
+            if memory:
+                self._store(key, value, min(self.ttl, remaining))
+            self.shared_hits += 1
+        return value
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _set_shared(self, key: str, value, ttl: float):
+        if not self._backend_available():
+            return
+        try:
+            self._backend.set(self._shared_key(key), self._encode(value), ttl)
+        except Exception:
+            self._backend_failed()
+
+    # memory=False reads and fills only the shared tier, for bulk crawls that would flush the LRU
+    def get(self, key: str, memory: bool = True):
+        value = self._get_memory(key) if memory else None
+        if value is None:
+            value = self._get_shared(key, memory)
+        if value is None:
+            self._count_miss()
+        return value
+
+    # Async get for the event loop: memory is checked inline, the shared tier in a worker thread
+    async def aget(self, key: str, memory: bool = True):
+        value = self._get_memory(key) if memory else None
+        if value is None and self._backend_available():
+            value = await asyncio.to_thread(self._get_shared, key, memory)
+        if value is None:
+            self._count_miss()
+        return value
+
+    # Seconds until a key expires from memory, None when not cached
+    def expires_in(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] - time.monotonic() if entry is not None else None
+
+    # Seconds until a key expires from the shared tier, None when missing or the tier is unavailable
+    def shared_expires_in(self, key: str):
+        if not self._backend_available():
+            return None
+        try:
+            return self._backend.expires_in(self._shared_key(key))
+        except Exception:
+            self._backend_failed()
+            return None
+
+    # ttl overrides the cache's default for this key
+    def set(self, key: str, value, ttl: float = None, memory: bool = True):
+        ttl = ttl or self.ttl
+        if memory:
+            with self._lock:
+                self._store(key, value, ttl)
+        self._set_shared(key, value, ttl)
+
+    # Async set for the event loop, the shared tier is written in a worker thread
+    async def aset(self, key: str, value, ttl: float = None, memory: bool = True):
+        ttl = ttl or self.ttl
+        if memory:
+            with self._lock:
+                self._store(key, value, ttl)
+        if self._backend_available():
+            await asyncio.to_thread(self._set_shared, key, value, ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._backend is not None:
+            self._backend.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "backend": self._backend.name if self._backend is not None else "none",
+                "version": self.version,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "shared_errors": self.shared_errors,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Short-lived LRU of upstream misses, so repeated bad lookups skip the network
+class NegativeCache:
+    def __init__(self, max_size: int = 4096, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # Cached status code of a miss, or None
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, status_code = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return status_code
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: str, status_code: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, status_code)
+            self._entries.move_to_end(key)
+            self.stores += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Lookup counts per resource, saved so the next process knows what to warm first.
+# Counts of earlier processes are halved on every save so old favourites fade out
+class AccessLog:
+    def __init__(self, path: str = None):
+        self.path = path
+        self.counts = Counter()
+        self.previous = Counter()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.previous = Counter(json.load(f))
+            except (OSError, ValueError):
+                self.previous = Counter()
+
+    def record(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    # Most looked-up keys of this and earlier processes, most first
+    def most_common(self, n: int) -> list:
+        with self._lock:
+            combined = self.previous + self.counts
+        return [key for key, _ in combined.most_common(n)]
+
+    # Write the counts atomically, replicas sharing the file keep the last writer's
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            merged = {key: count / 2 for key, count in self.previous.items() if count >= 1}
+            for key, count in self.counts.items():
+                merged[key] = merged.get(key, 0) + count
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(merged, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,62 @@
+# Import libraries
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from urllib.parse import urlsplit
+
+# Offline snapshot settings
+SNAPSHOT_PATH = os.getenv("POKEAPI_SNAPSHOT_PATH")
+OFFLINE = os.getenv("POKEAPI_OFFLINE", "0") == "1"
+
+
+# Snapshot key of a PokéAPI URL, e.g. "pokemon/25" or "pokemon" for list queries
+def snapshot_key(url: str) -> str:
+    parts = urlsplit(url)
+    path = parts.path
+    if "/api/v2/" in path:
+        path = path.split("/api/v2/", 1)[1]
+    return path.strip("/").lower()
+
+
+# Read-only view of a snapshot built by pokeapi_snapshot/build_snapshot.py
+class Snapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        meta = dict(self._conn().execute("SELECT key, value FROM meta").fetchall())
+        self.created_at = meta.get("created_at")
+        self.resource_count = int(meta.get("resource_count", 0))
+
+    # One connection per thread, SQLite handles concurrent readers
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str):
+        row = self._conn().execute(
+            "SELECT r.body FROM paths p JOIN resources r ON r.id = p.resource WHERE p.path = ?",
+            (snapshot_key(url),),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    # Every stored resource of one kind, e.g. all "pokemon"
+    def iter_kind(self, kind: str):
+        rows = self._conn().execute(
+            "SELECT body FROM resources WHERE kind = ? ORDER BY resource_id", (kind,)
+        )
+        for (body,) in rows:
+            yield json.loads(zlib.decompress(body))
+
+
+# Open the configured snapshot, None when it is not available
+def load_snapshot(path: str = SNAPSHOT_PATH):
+    if not path or not os.path.exists(path):
+        return None
+    return Snapshot(path)
@@ -1,61 +1,146 @@
 # Import libraries
-import pandas as pd
+import numpy as np
 from pokemon_info import *
-import logging
-import sys
+from fetch_plan import FetchPlan
+from evolution_graph import format_tree
+from deadline import gather_within_budget
+from log_setup import get_logger
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-
-
-# Compare two pokemons
-def compare_pokemons(pokemon1: str, pokemon2: str):
-    logger.info(f"Comparing Pokémon: {pokemon1} vs {pokemon2}")
-    def gather_all_data(pokemon):
-        logger.info(f"Gathering data for Pokémon: {pokemon}")
-        try:
-            info = fetch_pokemon_info(pokemon)
-            logger.info(f"Fetched basic info for {pokemon}")
-            species = get_species_details_of_pokemon(pokemon)
-            logger.info(f"Fetched species details for {pokemon}")
-            habitat = get_pokemon_habitat(pokemon)
-            logger.info(f"Fetched habitat info for {pokemon}")
-            evolution_chain = get_evolution_chain_of_pokemon(pokemon)
-            logger.info(f"Fetched evolution chain for {pokemon}")
-            base_stats = info.pop("Base Stats", {})
-            flat_data = {
-                **info,
-                **{f"Stat_{k}": v for k, v in base_stats.items()},
-                "Habitat": habitat,
-                "Is Legendary": species["is_legendary"],
-                "Is Mythical": species["is_mythical"],
-                "Capture Rate": species["capture_rate"],
-                "Base Happiness": species["base_happiness"],
-                "Gender Rate": species["gender_rate"],
-                "Egg Groups": ", ".join(species["egg_groups"]),
-                "Evolution Chain": " → ".join(evolution_chain),
-                "Flavor Text": species["flavor_text"]
-            }
-            logger.info(f"Successfully gathered all data for {pokemon}")
-            return flat_data
-        except Exception as e:
-            logger.error(f"Error while gathering data for {pokemon}: {str(e)}")
-            raise
+logger = get_logger("compare", sample_rate=0.1)
+
+
+# Gather all data of a Pokemon through a shared fetch plan
+async def gather_all_data(pokemon: str, plan: FetchPlan):
+    logger.info("Gathering data for Pokémon: %s", pokemon)
+    status_code, data = await plan.get(resource_url("pokemon", pokemon))
+    if status_code != 200:
+        logger.warning("Failed to fetch Pokémon info: %s, Status code: %s", pokemon, status_code)
+        return {
+            'status_code': status_code,
+            'detail': f"Pokémon '{pokemon}' not found."
+        }
+    status_code, species = await plan.get(data.species_url)
+    if status_code != 200:
+        logger.warning("Failed to fetch species details: %s, Status code: %s", pokemon, status_code)
+        return {
+            'status_code': status_code,
+            'detail': f"Pokémon '{pokemon}' not found."
+        }
+    evolution_tree = graph.tree_for(species.name)
+    if evolution_tree is None and species.evolution_chain_url is not None:
+        status_code, evolution_chain = await plan.get(species.evolution_chain_url)
+        if status_code == 200:
+            evolution_tree = graph.chains[graph.add_chain(evolution_chain)]
+    info = data.info()
+    base_stats = info.pop("Base Stats", {})
+    flat_data = {
+        **info,
+        **{f"Stat_{k}": v for k, v in base_stats.items()},
+        "Habitat": species.habitat_name(),
+        "Is Legendary": species.is_legendary,
+        "Is Mythical": species.is_mythical,
+        "Capture Rate": species.capture_rate,
+        "Base Happiness": species.base_happiness,
+        "Gender Rate": species.gender_rate,
+        "Egg Groups": ", ".join(species.egg_groups),
+        "Evolution Chain": format_tree(evolution_tree) if evolution_tree else None,
+        "Flavor Text": species.flavor_text
+    }
+    logger.info("Successfully gathered all data for %s", pokemon)
+    return flat_data
+
+
+# Marker of a result cut short by the request budget
+def partial_marker(missing: list) -> dict:
+    return {
+        "partial": True,
+        "detail": "Request budget exhausted before all data arrived",
+        "missing": missing,
+    }
+
+
+# Compare two pokemons, names already normalized by the endpoint
+# Over budget, returns the Pokémon gathered in time marked as partial
+async def compare_pokemons(pokemon1: str, pokemon2: str):
+    logger.info("Comparing Pokémon: %s vs %s", pokemon1, pokemon2)
+    plan = FetchPlan()
     try:
-        data1 = gather_all_data(pokemon1)
-        data2 = gather_all_data(pokemon2)
-        df = pd.DataFrame([data1, data2], index=[pokemon1.capitalize(), pokemon2.capitalize()])
-        logger.info(f"Successfully created comparison DataFrame for {pokemon1} and {pokemon2}")
-        return df.to_dict(orient='records')
+        (data1, data2), cut_off = await gather_within_budget(
+            gather_all_data(pokemon1, plan),
+            gather_all_data(pokemon2, plan),
+        )
+        if cut_off:
+            plan.cancel()
+        for data in (data1, data2):
+            if data is not None and "status_code" in data:
+                return data
+        logger.info("Fetched %s distinct resources for %s and %s", plan.fetch_count, pokemon1, pokemon2)
+        # Rows are already flat records, served in request order
+        results = [data for data in (data1, data2) if data is not None]
+        if cut_off:
+            logger.warning("Comparison of %s and %s cut off by the request budget", pokemon1, pokemon2)
+            return {
+                **partial_marker([(pokemon1, pokemon2)[i] for i in cut_off]),
+                "results": results,
+            }
+        logger.info("Successfully compared %s and %s", pokemon1, pokemon2)
+        return results
     except Exception as e:
-        logger.error(f"Comparison failed for {pokemon1} and {pokemon2}: {str(e)}")
+        logger.error("Comparison failed for %s and %s: %s", pokemon1, pokemon2, e)
         raise
+
+
+# Compare a whole team of pokemons in one vectorized pass, names already normalized by the endpoint
+# Over budget, compares the Pokémon gathered in time and marks the result as partial
+async def compare_pokemon_team(pokemon_names: list):
+    names = list(dict.fromkeys(pokemon_names))
+    logger.info("Comparing team of %s Pokémon: %s", len(names), names)
+    plan = FetchPlan()
+    records, cut_off = await gather_within_budget(*(gather_all_data(name, plan) for name in names))
+    if cut_off:
+        plan.cancel()
+    for record in records:
+        if record is not None and "status_code" in record:
+            return record
+    records = [record for record in records if record is not None]
+    if not records:
+        return {"status_code": 504, "detail": "Request budget exhausted before any Pokémon data arrived"}
+    logger.info("Fetched %s distinct resources for team of %s", plan.fetch_count, len(names))
+    stat_names = [k for k in records[0] if k.startswith("Stat_")]
+    stats = np.array([[r.get(k, 0) for k in stat_names] for r in records], dtype=np.float64)
+    stat_names = [k[len("Stat_"):] for k in stat_names] + ["Total"]
+    stats = np.column_stack([stats, stats.sum(axis=1)])
+    mean = stats.mean(axis=0)
+    std = stats.std(axis=0)
+    # Rank 1 is the highest value, ties share a rank
+    ranks = (stats[None, :, :] > stats[:, None, :]).sum(axis=1) + 1
+    delta = stats - mean
+    z_scores = np.divide(delta, std, out=np.zeros_like(delta), where=std > 0)
+
+    def columns(matrix, digits=None):
+        values = np.round(matrix, digits) if digits is not None else matrix
+        return {name: values[:, i].tolist() for i, name in enumerate(stat_names)}
+
+    def per_stat(vector, digits=2):
+        return {name: round(float(v), digits) for name, v in zip(stat_names, vector)}
+
+    attribute_names = [k for k in records[0] if not k.startswith("Stat_")]
+    partial = partial_marker([names[i] for i in cut_off]) if cut_off else {}
+    return {
+        **partial,
+        "names": [r["Name"] for r in records],
+        "stat_names": stat_names,
+        "stats": {name: [int(v) for v in col] for name, col in columns(stats).items()},
+        "ranks": {name: [int(v) for v in col] for name, col in columns(ranks).items()},
+        "delta_from_mean": columns(delta, 2),
+        "z_scores": columns(z_scores, 3),
+        "team": {
+            "mean": per_stat(mean),
+            "std": per_stat(std),
+            "min": per_stat(stats.min(axis=0)),
+            "max": per_stat(stats.max(axis=0)),
+            "best": {name: records[i]["Name"] for name, i in zip(stat_names, stats.argmax(axis=0))},
+        },
+        "attributes": {k: [r.get(k) for r in records] for k in attribute_names},
+    }
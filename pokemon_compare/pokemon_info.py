@@ -1,176 +1,132 @@
 # Import libraries
-import requests
-import logging
-import sys
+from pokeapi_client import aget_json, resource_url
+from evolution_graph import graph, tree_species
+from log_setup import get_logger
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+logger = get_logger("lookup", sample_rate=0.1)
 
 
 # Fetch information of Pokemon
-def fetch_pokemon_info(pokemon_name: str):
-    logger.info(f"Fetching info for Pokémon: {pokemon_name}")
-    url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.warning(f"Failed to fetch Pokémon info: {pokemon_name}, Status code: {response.status_code}")
+async def fetch_pokemon_info(pokemon_name: str):
+    logger.info("Fetching info for Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+    if status_code != 200:
+        logger.warning("Failed to fetch Pokémon info: %s, Status code: %s", pokemon_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    logger.info(f"Successfully fetched info for Pokémon: {pokemon_name}")
-    data = response.json()
-    info = {
-        "Name": data["name"].capitalize(),
-        "ID": data["id"],
-        "Height": f'{data["height"] / 10} m',
-        "Weight": f'{data["weight"] / 10} kg',
-        "Types": [t["type"]["name"].capitalize() for t in data["types"]],
-        "Abilities": [a["ability"]["name"].replace('-', ' ').capitalize()
-                      for a in data["abilities"]],
-        "Base Stats": {
-            stat["stat"]["name"].capitalize(): stat["base_stat"]
-            for stat in data["stats"]
-        }
-    }
-    return info
+    logger.info("Successfully fetched info for Pokémon: %s", pokemon_name)
+    return data.info()
 
 
-# Evolution chain of a Pokemon
-def get_evolution_chain_of_pokemon(pokemon_name: str):
-    logger.info(f"Fetching evolution chain for Pokémon: {pokemon_name}")
-    res = requests.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}")
-    if res.status_code != 200:
-        logger.warning(f"Failed to fetch evolution chain: {pokemon_name}, Status code: {res.status_code}")
+# Evolution tree of a Pokemon, filled lazily into the evolution graph
+async def get_evolution_tree_of_pokemon(pokemon_name: str):
+    tree = graph.tree_for(pokemon_name)
+    if tree is not None:
+        return tree
+    logger.info("Fetching evolution chain for Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+    if status_code != 200:
+        logger.warning("Failed to fetch Pokémon data: %s, Status Code: %s", pokemon_name, status_code)
         return {
-            'status_code': res.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    species_url = res.json()["species"]["url"]
-    species_data = requests.get(species_url).json()
-    evolution_url = species_data["evolution_chain"]["url"]
-    evolution_chain_data = requests.get(evolution_url).json()
-    logger.info(f"Successfully fetched evolution chain data for Pokémon: {pokemon_name}")
-
-    def extract_chain(chain):
-        names = []
-        while chain:
-            names.append(chain["species"]["name"].capitalize())
-            if chain["evolves_to"]:
-                chain = chain["evolves_to"][0]
+    chain_id = graph.chain_id_for(data.species)
+    if chain_id is None:
+        status_code, species_data = await aget_json(data.species_url)
+        if status_code == 200:
+            if species_data.evolution_chain_url is None:
+                status_code = 404
             else:
-                break
-        return names
+                status_code, evolution_chain = await aget_json(species_data.evolution_chain_url)
+        if status_code != 200:
+            logger.warning("Failed to fetch evolution chain: %s, Status Code: %s", pokemon_name, status_code)
+            return {
+                'status_code': status_code,
+                'detail': f"Evolution chain of '{pokemon_name}' not found."
+            }
+        chain_id = graph.add_chain(evolution_chain)
+    graph.alias(pokemon_name, chain_id)
+    logger.info("Evolution chain %s resolved for %s", chain_id, pokemon_name)
+    return graph.chains[chain_id]
+
 
-    return extract_chain(evolution_chain_data["chain"])
+# Evolution chain of a Pokemon, every branch included
+async def get_evolution_chain_of_pokemon(pokemon_name: str):
+    tree = await get_evolution_tree_of_pokemon(pokemon_name)
+    if "status_code" in tree:
+        return tree
+    return [name.capitalize() for name in tree_species(tree)]
 
 
 # Get pokemons by ability
-def get_pokemons_by_ability(ability_name: str):
-    logger.info(f"Fetching Pokémon with ability: {ability_name}")
-    url = f"https://pokeapi.co/api/v2/ability/{ability_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.warning(f"Failed to fetch Pokémon by ability: {ability_name}, Status code: {response.status_code}")
+async def get_pokemons_by_ability(ability_name: str):
+    logger.info("Fetching Pokémon with ability: %s", ability_name)
+    status_code, data = await aget_json(resource_url("ability", ability_name))
+    if status_code != 200:
+        logger.warning("Failed to fetch Pokémon by ability: %s, Status code: %s", ability_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Ability '{ability_name}' not found."
         }
-    logger.info(f"Successfully fetched Pokémon list with ability: {ability_name}")
-    data = response.json()
-    pokemon_list = [entry['pokemon']['name'] for entry in data['pokemon']]
+    logger.info("Successfully fetched Pokémon list with ability: %s", ability_name)
+    pokemon_list = list(data.pokemon)
     return pokemon_list
 
 
 # Get move details of pokemon
-def get_move_details_of_pokemon(move_name: str):
-    logger.info(f"Fetching move details for: {move_name}")
-    url = f"https://pokeapi.co/api/v2/move/{move_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.warning(f"Failed to fetch move details: {move_name}, Status code: {response.status_code}")
+async def get_move_details_of_pokemon(move_name: str):
+    logger.info("Fetching move details for: %s", move_name)
+    status_code, data = await aget_json(resource_url("move", move_name))
+    if status_code != 200:
+        logger.warning("Failed to fetch move details: %s, Status code: %s", move_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Move '{move_name}' not found."
         }
-    data = response.json()
-    logger.info(f"Successfully fetched move details for: {move_name}")
-    move_info = {
-        "name": data["name"],
-        "type": data["type"]["name"],
-        "power": data["power"],
-        "accuracy": data["accuracy"],
-        "pp": data["pp"],
-        "damage_class": data["damage_class"]["name"],
-        "effect": None
-    }
-    for entry in data["effect_entries"]:
-        if entry["language"]["name"] == "en":
-            move_info["effect"] = entry["short_effect"]
-            break
+    logger.info("Successfully fetched move details for: %s", move_name)
+    move_info = data.details()
     return move_info
 
 
-# Get species details of Pokemon
-def get_species_details_of_pokemon(pokemon_name):
-    logger.info(f"Fetching species details for Pokémon: {pokemon_name}")
-    url = f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.warning(f"Failed to fetch species details: {pokemon_name}, Status code: {response.status_code}")
+# Get species details of Pokemon. Forms such as raichu-alola have no species of their own,
+# so a name PokéAPI does not know as a species goes through the pokemon record's species link
+async def get_species_details_of_pokemon(pokemon_name):
+    logger.info("Fetching species details for Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon-species", pokemon_name))
+    if status_code == 404:
+        status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+        if status_code == 200:
+            status_code, data = await aget_json(data.species_url)
+    if status_code != 200:
+        logger.warning("Failed to fetch species details: %s, Status code: %s", pokemon_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    data = response.json()
-    logger.info(f"Successfully fetched species details for Pokémon: {pokemon_name}")
-    flavor_text = None
-    for entry in data["flavor_text_entries"]:
-        if entry["language"]["name"] == "en":
-            flavor_text = entry["flavor_text"].replace('\n', ' ').replace('\f', ' ')
-            break
-    return {
-        "name": data["name"],
-        "is_legendary": data["is_legendary"],
-        "is_mythical": data["is_mythical"],
-        "capture_rate": data["capture_rate"],
-        "base_happiness": data["base_happiness"],
-        "gender_rate": data["gender_rate"],
-        "egg_groups": [group["name"] for group in data["egg_groups"]],
-        "evolution_chain_url": data["evolution_chain"]["url"],
-        "flavor_text": flavor_text
-    }
+    logger.info("Successfully fetched species details for Pokémon: %s", pokemon_name)
+    return data.details()
 
 
 # Get habitat of Pokemon
-def get_pokemon_habitat(pokemon_name):
-    logger.info(f"Fetching habitat for Pokémon: {pokemon_name}")
-    base_url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-    response = requests.get(base_url)
-    if response.status_code != 200:
-        logger.warning(f"Failed to fetch Pokémon base info for habitat: {pokemon_name}, Status code: {response.status_code}")
+async def get_pokemon_habitat(pokemon_name):
+    logger.info("Fetching habitat for Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+    if status_code != 200:
+        logger.warning("Failed to fetch Pokémon base info for habitat: %s, Status code: %s", pokemon_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    species_url = response.json()["species"]["url"]
-    species_response = requests.get(species_url)
-    if species_response.status_code != 200:
-        logger.warning(f"Failed to fetch Pokémon species for habitat: {pokemon_name}, Status code: {species_response.status_code}")
+    status_code, species_data = await aget_json(data.species_url)
+    if status_code != 200:
+        logger.warning("Failed to fetch Pokémon species for habitat: %s, Status code: %s", pokemon_name, status_code)
         return {
-            'status_code': species_response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    species_data = species_response.json()
-    habitat = species_data.get("habitat")
-    logger.info(f"Successfully fetched habitat for Pokémon: {pokemon_name}")
-    return habitat["name"] if habitat else "No specific habitat (possibly legendary or event Pokémon)."
+    logger.info("Successfully fetched habitat for Pokémon: %s", pokemon_name)
+    return species_data.habitat_name()
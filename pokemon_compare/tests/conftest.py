@@ -0,0 +1,5 @@
+# Service modules import each other by bare name, so tests run with the service directory on the path
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
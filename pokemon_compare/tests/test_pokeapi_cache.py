@@ -0,0 +1,139 @@
+import types
+import pytest
+import pokeapi_cache
+from pokeapi_cache import CacheBackend, NegativeCache, ResponseCache, SQLiteBackend
+from records import Pokemon, parse_record, to_payload
+
+PIKACHU = {
+    "id": 25, "name": "pikachu", "height": 4, "weight": 60,
+    "species": {"name": "pikachu", "url": "https://pokeapi.co/api/v2/pokemon-species/25/"},
+    "types": [{"slot": 1, "type": {"name": "electric"}}],
+    "stats": [{"base_stat": 35, "stat": {"name": "hp"}}, {"base_stat": 90, "stat": {"name": "speed"}}],
+    "abilities": [{"ability": {"name": "static"}}],
+    "moves": [{"move": {"name": "thunderbolt"}}],
+}
+
+
+# Clock of the cache module, moved forward by hand
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1000.0}
+    fake = types.SimpleNamespace(monotonic=lambda: now["t"], time=lambda: now["t"])
+    monkeypatch.setattr(pokeapi_cache, "time", fake)
+    return lambda seconds: now.update(t=now["t"] + seconds)
+
+
+def test_lru_evicts_the_least_recently_used_key(clock):
+    cache = ResponseCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ResponseCache(ttl=60)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+    clock(10)
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+    assert cache.expires_in("default") == pytest.approx(50)
+    clock(60)
+    assert cache.get("default") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 2
+    assert stats["misses"] == 2
+
+
+def test_shared_tier_hit_keeps_its_remaining_ttl_in_memory(clock, tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    writer = ResponseCache(ttl=60, backend=backend)
+    reader = ResponseCache(ttl=60, backend=backend)
+    writer.set("a", {"x": 1}, ttl=30)
+    clock(20)
+    assert reader.get("a") == {"x": 1}
+    assert reader.expires_in("a") == pytest.approx(10)
+    assert reader.shared_expires_in("a") == pytest.approx(10)
+    clock(11)
+    assert reader.get("a") is None
+    assert reader.stats()["shared_hits"] == 1
+
+
+def test_memory_false_reads_and_fills_only_the_shared_tier(clock, tmp_path):
+    cache = ResponseCache(backend=SQLiteBackend(str(tmp_path / "cache.sqlite3")))
+    cache.set("a", 1, memory=False)
+    assert cache.expires_in("a") is None
+    assert cache.get("a", memory=False) == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_records_go_to_the_shared_tier_as_compact_payloads(clock, tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    encode, decode = to_payload, (lambda key, stored: parse_record("pokemon", stored))
+    writer = ResponseCache(backend=backend, encode=encode, decode=decode)
+    reader = ResponseCache(backend=backend, encode=encode, decode=decode)
+    record = parse_record("pokemon", PIKACHU)
+    writer.set("pokemon/pikachu", record)
+    shared = backend.get("pokeapi:v1:pokemon/pikachu")[0]
+    assert shared == record.to_payload()
+    assert reader.get("pokemon/pikachu") == record
+    assert isinstance(reader.get("pokemon/pikachu"), Pokemon)
+
+
+# Shared tier that fails every call
+class BrokenBackend(CacheBackend):
+    name = "broken"
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise ConnectionError("down")
+
+    def set(self, key, value, ttl):
+        self.calls += 1
+        raise ConnectionError("down")
+
+    def expires_in(self, key):
+        self.calls += 1
+        raise ConnectionError("down")
+
+    def clear(self):
+        pass
+
+
+def test_shared_tier_outage_degrades_to_misses_and_backs_off(clock):
+    backend = BrokenBackend()
+    cache = ResponseCache(backend=backend)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert backend.calls == 1
+    assert cache.stats()["shared_errors"] == 1
+    clock(pokeapi_cache.BACKEND_RETRY_AFTER)
+    assert cache.get("b") is None
+    assert backend.calls == 2
+
+
+def test_negative_cache_forgets_misses_after_its_ttl(clock):
+    negative = NegativeCache(max_size=2, ttl=300)
+    negative.set("pokemon/missingno", 404)
+    assert negative.get("pokemon/missingno") == 404
+    clock(301)
+    assert negative.get("pokemon/missingno") is None
+    stats = negative.stats()
+    assert stats["hits"] == 1 and stats["expirations"] == 1
+
+
+def test_negative_cache_is_bounded(clock):
+    negative = NegativeCache(max_size=2, ttl=300)
+    for name in ("a", "b", "c"):
+        negative.set(name, 404)
+    assert negative.get("a") is None
+    assert negative.get("c") == 404
+    assert negative.stats()["evictions"] == 1
@@ -1,31 +1,70 @@
 # Import libraries
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from typing import Literal
+import asyncio
 from pokemon_info import (
     fetch_pokemon_info,
-    get_evolution_chain_of_pokemon,
+    get_evolution_tree_of_pokemon,
     get_pokemons_by_ability,
     get_move_details_of_pokemon,
     get_species_details_of_pokemon,
     get_pokemon_habitat,
 )
-import logging
-import sys
+from pokeapi_client import cache, close_async_client, negative_cache
+from metrics import install_metrics
+from tracing import install_tracing
+from cache_warmer import install_cache_warmer
+from fast_json import FastJSONResponse, RenderedResponses
+from single_flight import SingleFlight, normalize_name
+from evolution_graph import graph, tree_species
+from pokeapi_client import snapshot
+from pokedex_index import STAT_NAMES, get_pokedex_index, load_pokedex_index
+from name_index import KINDS, indexes, load_name_indexes, normalize
+from log_setup import get_logger
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+logger = get_logger()
 
 # FastAPI app
-app = FastAPI(title="Pokémon Info API")
+app = FastAPI(title="Pokémon Info API", default_response_class=FastJSONResponse)
+
+# Serialized responses of recently looked up names
+rendered = RenderedResponses()
+
+install_metrics(app, {"response": cache, "negative": negative_cache, "rendered": rendered})
+install_tracing(app, "pokemon-info")
+install_cache_warmer(app)
+
+# Concurrent identical lookups share one upstream fetch
+flights = SingleFlight()
+
+
+# Fill the evolution graph from the local snapshot, if there is one
+@app.on_event("startup")
+async def load_evolution_graph():
+    if snapshot is not None:
+        count = graph.load(snapshot.iter_kind("evolution-chain"))
+        logger.info("Loaded %s evolution chains from snapshot", count)
+
+
+# Build the ability/move/type/egg-group indexes in the background
+@app.on_event("startup")
+async def start_pokedex_index():
+    app.state.index_task = asyncio.create_task(load_pokedex_index())
+
+
+# Build the Pokémon, species, move and ability name indexes in the background
+@app.on_event("startup")
+async def start_name_index():
+    app.state.name_index_task = asyncio.create_task(load_name_indexes())
+
+
+# Release pooled PokéAPI connections on shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    await close_async_client()
+
 
 # Request body models
 class PokemonName(BaseModel):
@@ -37,74 +76,175 @@ class AbilityName(BaseModel):
 class MoveName(BaseModel):
     move_name: str
 
+class QueryFilter(BaseModel):
+    abilities: list[str] = []
+    moves: list[str] = []
+    types: list[str] = []
+    egg_groups: list[str] = []
+
+class StatRange(BaseModel):
+    min: int | None = None
+    max: int | None = None
+
+class PokemonQuery(BaseModel):
+    all_of: QueryFilter = QueryFilter()
+    any_of: QueryFilter = QueryFilter()
+    stats: dict[Literal[STAT_NAMES], StatRange] = {}
+    limit: int = 100
+
+class SuggestQuery(BaseModel):
+    query: str
+    kind: Literal[KINDS] = "pokemon"
+    limit: int = 10
+
 # Endpoint of the root page
 @app.get("/")
-def root():
+async def root():
     logger.info("Accessed root endpoint.")
     return {"message": "Welcome to the Pokémon Info API"}
 
 # Ndpoint to get information of a pokemon
 @app.post("/pokemon-info")
-def pokemon_info(body: PokemonName):
-    logger.info(f"Received request for Pokémon info: {body.pokemon_name}")
-    result = fetch_pokemon_info(body.pokemon_name)
+async def pokemon_info(body: PokemonName):
+    logger.info("Received request for Pokémon info: %s", body.pokemon_name)
+    name = normalize_name(body.pokemon_name)
+    key = f"pokemon-info/{name}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
+    result = await flights.do(("pokemon-info", name), fetch_pokemon_info, name)
     if "status_code" in result:
-        logger.error(f"Error fetching info for {body.pokemon_name}: {result['detail']}")
+        logger.error("Error fetching info for %s: %s", body.pokemon_name, result['detail'])
         raise HTTPException(status_code=result["status_code"], detail=result["detail"])
-    logger.info(f"Successfully fetched info for {body.pokemon_name}")
-    return result
+    logger.info("Successfully fetched info for %s", body.pokemon_name)
+    return rendered.render(key, result)
 
 # Endpoint to get evolution chain of a pokemon
 @app.post("/pokemon-evolution-chain")
-def evolution_chain(body: PokemonName):
-    logger.info(f"Received request for evolution chain of: {body.pokemon_name}")
-    result = get_evolution_chain_of_pokemon(body.pokemon_name)
-    if isinstance(result, dict) and "status_code" in result:
-        logger.error(f"Error fetching evolution chain for {body.pokemon_name}: {result['detail']}")
+async def evolution_chain(body: PokemonName):
+    logger.info("Received request for evolution chain of: %s", body.pokemon_name)
+    name = normalize_name(body.pokemon_name)
+    key = f"pokemon-evolution-chain/{name}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
+    result = await flights.do(("pokemon-evolution-chain", name), get_evolution_tree_of_pokemon, name)
+    if "status_code" in result:
+        logger.error("Error fetching evolution chain for %s: %s", body.pokemon_name, result['detail'])
         raise HTTPException(status_code=result["status_code"], detail=result["detail"])
-    logger.info(f"Successfully fetched evolution chain for {body.pokemon_name}")
-    return {"evolution_chain": result}
+    logger.info("Successfully fetched evolution chain for %s", body.pokemon_name)
+    return rendered.render(key, {
+        "evolution_chain": [species.capitalize() for species in tree_species(result)],
+        "evolution_tree": result,
+    })
 
 # Endpoint to get pokemons with given ability
 @app.post("/pokemon-ability")
-def pokemons_by_ability(body: AbilityName):
-    logger.info(f"Received request for Pokémon with ability: {body.ability_name}")
-    result = get_pokemons_by_ability(body.ability_name)
+async def pokemons_by_ability(body: AbilityName):
+    logger.info("Received request for Pokémon with ability: %s", body.ability_name)
+    name = normalize_name(body.ability_name)
+    key = f"pokemon-ability/{name}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
+    result = await flights.do(("pokemon-ability", name), get_pokemons_by_ability, name)
     if isinstance(result, dict) and "status_code" in result:
-        logger.error(f"Error fetching Pokémon by ability {body.ability_name}: {result['detail']}")
+        logger.error("Error fetching Pokémon by ability %s: %s", body.ability_name, result['detail'])
         raise HTTPException(status_code=result["status_code"], detail=result["detail"])
-    logger.info(f"Successfully fetched Pokémon with ability {body.ability_name}")
-    return {"pokemons": result}
+    logger.info("Successfully fetched Pokémon with ability %s", body.ability_name)
+    return rendered.render(key, {"pokemons": result})
 
 # Endpoiunt to get details of a move
 @app.post("/pokemon-move")
-def move_details(body: MoveName):
-    logger.info(f"Received request for move details: {body.move_name}")
-    result = get_move_details_of_pokemon(body.move_name)
+async def move_details(body: MoveName):
+    logger.info("Received request for move details: %s", body.move_name)
+    name = normalize_name(body.move_name)
+    key = f"pokemon-move/{name}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
+    result = await flights.do(("pokemon-move", name), get_move_details_of_pokemon, name)
     if isinstance(result, dict) and "status_code" in result:
-        logger.error(f"Error fetching move details for {body.move_name}: {result['detail']}")
+        logger.error("Error fetching move details for %s: %s", body.move_name, result['detail'])
         raise HTTPException(status_code=result["status_code"], detail=result["detail"])
-    logger.info(f"Successfully fetched move details for {body.move_name}")
-    return result
+    logger.info("Successfully fetched move details for %s", body.move_name)
+    return rendered.render(key, result)
 
 # Endpoint to get pokemon species of a pokemon
 @app.post("/pokemon-species")
-def species_details(body: PokemonName):
-    logger.info(f"Received request for species details: {body.pokemon_name}")
-    result = get_species_details_of_pokemon(body.pokemon_name)
+async def species_details(body: PokemonName):
+    logger.info("Received request for species details: %s", body.pokemon_name)
+    name = normalize_name(body.pokemon_name)
+    key = f"pokemon-species/{name}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
+    result = await flights.do(("pokemon-species", name), get_species_details_of_pokemon, name)
     if "status_code" in result:
-        logger.error(f"Error fetching species details for {body.pokemon_name}: {result['detail']}")
+        logger.error("Error fetching species details for %s: %s", body.pokemon_name, result['detail'])
         raise HTTPException(status_code=result["status_code"], detail=result["detail"])
-    logger.info(f"Successfully fetched species details for {body.pokemon_name}")
-    return result
+    logger.info("Successfully fetched species details for %s", body.pokemon_name)
+    return rendered.render(key, result)
 
 # Endpoint to get habitat of a pokemon
 @app.post("/pokemon-habitat")
-def pokemon_habitat(body: PokemonName):
-    logger.info(f"Received request for habitat of: {body.pokemon_name}")
-    result = get_pokemon_habitat(body.pokemon_name)
+async def pokemon_habitat(body: PokemonName):
+    logger.info("Received request for habitat of: %s", body.pokemon_name)
+    name = normalize_name(body.pokemon_name)
+    key = f"pokemon-habitat/{name}"
+    cached = rendered.get(key)
+    if cached is not None:
+        return cached
+    result = await flights.do(("pokemon-habitat", name), get_pokemon_habitat, name)
     if isinstance(result, dict) and "status_code" in result:
-        logger.error(f"Error fetching habitat for {body.pokemon_name}: {result['detail']}")
+        logger.error("Error fetching habitat for %s: %s", body.pokemon_name, result['detail'])
         raise HTTPException(status_code=result["status_code"], detail=result["detail"])
-    logger.info(f"Successfully fetched habitat for {body.pokemon_name}")
-    return {"habitat": result}
+    logger.info("Successfully fetched habitat for %s", body.pokemon_name)
+    return rendered.render(key, {"habitat": result})
+
+# Endpoint to query Pokémon by abilities, moves, types, egg groups and stat ranges
+@app.post("/pokemon-query")
+async def pokemon_query(body: PokemonQuery):
+    logger.info("Received Pokémon query: %s", body)
+    index = get_pokedex_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Pokédex index is still loading, try again shortly.")
+    ids = index.query(
+        all_of=body.all_of.model_dump(),
+        any_of=body.any_of.model_dump(),
+        stats={stat: bounds.model_dump() for stat, bounds in body.stats.items()},
+    )
+    logger.info("Pokémon query matched %s Pokémon", len(ids))
+    return FastJSONResponse({"count": int(len(ids)), "pokemons": [index.names[i] for i in ids[:body.limit].tolist()]})
+
+
+# Endpoint to autocomplete and spell-correct Pokémon, species, move and ability names
+@app.post("/pokemon-suggest")
+async def pokemon_suggest(body: SuggestQuery):
+    logger.info("Received suggest request for %s: %s", body.kind, body.query)
+    index = indexes.get(body.kind)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Name index is still loading, try again shortly.")
+    resolved, _ = index.resolve(body.query)
+    name = normalize(body.query)
+    return FastJSONResponse({
+        "query": body.query,
+        "resolved": resolved,
+        "prefix_matches": index.prefix(name, body.limit),
+        "fuzzy_matches": [
+            {"name": candidate, "distance": distance}
+            for distance, candidate in index.fuzzy(name, body.limit)
+        ],
+    })
+
+
+# Endpoint to get PokéAPI response and negative cache counters
+@app.get("/cache-stats")
+async def cache_stats():
+    return {**cache.stats(), "negative": negative_cache.stats(), "rendered": rendered.stats()}
+
+
+# Endpoint to get request coalescing counters
+@app.get("/single-flight-stats")
+async def single_flight_stats():
+    return flights.stats()
@@ -0,0 +1,152 @@
+# Import libraries
+import asyncio
+import os
+from fastapi import FastAPI, Response
+from pokeapi_client import POKEAPI_BASE_URL, access_log, aget_json, cache
+from log_setup import get_logger
+
+logger = get_logger()
+
+# Warmer settings
+# WARM_RESOURCES lists resource paths to preload, e.g. "pokemon/pikachu,type/fire,move/thunderbolt"
+WARM_RESOURCES = [path.strip().strip("/").lower() for path in os.getenv("WARM_RESOURCES", "").split(",") if path.strip()]
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", "500"))
+WARM_CONCURRENCY = int(os.getenv("WARM_CONCURRENCY", "10"))
+WARM_READY_THRESHOLD = float(os.getenv("WARM_READY_THRESHOLD", "0.9"))
+WARM_REFRESH_INTERVAL = float(os.getenv("WARM_REFRESH_INTERVAL", "300"))
+WARM_REFRESH_MARGIN = float(os.getenv("WARM_REFRESH_MARGIN", "3600"))
+# Resource kinds worth keeping warm, list queries and unknown kinds are skipped
+WARM_KINDS = {"pokemon", "pokemon-species", "type", "move", "ability", "evolution-chain"}
+
+
+# Preloads the configured and most looked-up resources, then keeps them from expiring
+class CacheWarmer:
+    def __init__(self, paths: list, concurrency: int = WARM_CONCURRENCY, ready_threshold: float = WARM_READY_THRESHOLD):
+        self.paths = paths
+        self.ready_threshold = ready_threshold
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.warmed = 0
+        self.failed = 0
+        self.refreshed = 0
+        self.done = False
+        self._tasks = []
+
+    # Resource paths to warm: configured ones first, then the previous process's favourites
+    @classmethod
+    def from_settings(cls):
+        recorded = [
+            path for path in access_log.most_common(WARM_TOP_N * 2)
+            if "/" in path and path.split("/", 1)[0] in WARM_KINDS
+        ]
+        paths = list(dict.fromkeys(WARM_RESOURCES + recorded[:WARM_TOP_N]))
+        return cls(paths)
+
+    @property
+    def progress(self) -> float:
+        return (self.warmed + self.failed) / len(self.paths) if self.paths else 1.0
+
+    def ready(self) -> bool:
+        return self.done or self.progress >= self.ready_threshold
+
+    async def _fetch(self, path: str, refresh: bool = False) -> bool:
+        async with self._semaphore:
+            try:
+                status_code, _ = await aget_json(f"{POKEAPI_BASE_URL}/{path}", refresh=refresh, track=False)
+                return status_code == 200
+            except Exception as e:
+                logger.warning("Failed to warm %s: %s", path, e)
+                return False
+
+    async def warm(self):
+        logger.info("Warming %s PokéAPI resources", len(self.paths))
+
+        async def warm_one(path):
+            if await self._fetch(path):
+                self.warmed += 1
+            else:
+                self.failed += 1
+
+        await asyncio.gather(*(warm_one(path) for path in self.paths))
+        self.done = True
+        logger.info("Warmed %s PokéAPI resources, %s failed", self.warmed, self.failed)
+
+    # Seconds until a resource expires from both cache tiers, None when neither holds it.
+    # The shared tier is only asked when memory is about to lose the entry
+    async def _expires_in(self, path: str):
+        key = f"{POKEAPI_BASE_URL}/{path}"
+        expires_in = cache.expires_in(key)
+        if expires_in is None or expires_in < WARM_REFRESH_MARGIN:
+            shared = await asyncio.to_thread(cache.shared_expires_in, key)
+            if shared is not None:
+                expires_in = max(expires_in or 0, shared)
+        return expires_in
+
+    # Fetch again every warmed entry that is gone or expires within WARM_REFRESH_MARGIN seconds,
+    # in memory and in the shared tier, so entries another replica refreshed are not fetched twice
+    async def refresh_expiring(self):
+        expiring = []
+        for path in self.paths:
+            expires_in = await self._expires_in(path)
+            if expires_in is None or expires_in < WARM_REFRESH_MARGIN:
+                expiring.append(path)
+        if expiring:
+            results = await asyncio.gather(*(self._fetch(path, refresh=True) for path in expiring))
+            self.refreshed += sum(results)
+            logger.info("Refreshed %s of %s expiring PokéAPI resources", sum(results), len(expiring))
+
+    # Refresh expiring entries and save access counts, in case the process is killed before shutdown
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(WARM_REFRESH_INTERVAL)
+            try:
+                await self.refresh_expiring()
+                await asyncio.to_thread(access_log.save)
+            except Exception as e:
+                logger.error("Cache refresh failed: %s", e)
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self.warm()), asyncio.create_task(self._refresh_loop())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "planned": len(self.paths),
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "refreshed": self.refreshed,
+            "progress": round(self.progress, 4),
+            "done": self.done,
+            "ready": self.ready(),
+        }
+
+
+# Start the warmer with the app, save access counts on shutdown, and add GET /ready and GET /warm-stats
+def install_cache_warmer(app: FastAPI):
+    @app.on_event("startup")
+    async def start_cache_warmer():
+        app.state.cache_warmer = CacheWarmer.from_settings()
+        app.state.cache_warmer.start()
+
+    @app.on_event("shutdown")
+    async def stop_cache_warmer():
+        await app.state.cache_warmer.stop()
+        try:
+            access_log.save()
+        except OSError as e:
+            logger.error("Failed to save access counts: %s", e)
+
+    # Readiness probe, 503 until warm-up passes WARM_READY_THRESHOLD
+    @app.get("/ready", include_in_schema=False)
+    async def ready(response: Response):
+        warmer = app.state.cache_warmer
+        if not warmer.ready():
+            response.status_code = 503
+        return warmer.stats()
+
+    @app.get("/warm-stats")
+    async def warm_stats():
+        return app.state.cache_warmer.stats()
@@ -0,0 +1,65 @@
+# Import libraries
+from collections import deque
+from records import EvolutionChain
+
+
+# Species names of a tree in breadth-first order
+def tree_species(tree: dict) -> list:
+    names = []
+    queue = deque([tree])
+    while queue:
+        node = queue.popleft()
+        names.append(node["species"])
+        queue.extend(node["evolves_to"])
+    return names
+
+
+# Readable chain, branches shown as (a | b)
+def format_tree(tree: dict) -> str:
+    name = tree["species"].capitalize()
+    children = tree["evolves_to"]
+    if not children:
+        return name
+    if len(children) == 1:
+        return f"{name} → {format_tree(children[0])}"
+    return f"{name} → ({' | '.join(format_tree(child) for child in children)})"
+
+
+# In-memory evolution graph, every family member maps to its chain
+class EvolutionGraph:
+    def __init__(self):
+        self.chains = {}
+        self.chain_of = {}
+
+    # Add an evolution chain record, returns the chain ID
+    def add_chain(self, chain: EvolutionChain) -> int:
+        self.chains[chain.id] = chain.tree
+        for name in tree_species(chain.tree):
+            self.chain_of[name] = chain.id
+        return chain.id
+
+    # Map another name (e.g. a form like "raichu-alola") to a known chain
+    def alias(self, name: str, chain_id: int):
+        self.chain_of[name.lower()] = chain_id
+
+    def chain_id_for(self, name: str):
+        return self.chain_of.get(name.lower())
+
+    def tree_for(self, name: str):
+        chain_id = self.chain_id_for(name)
+        return self.chains.get(chain_id) if chain_id is not None else None
+
+    # Add PokéAPI /evolution-chain payloads, e.g. from the snapshot
+    def load(self, chains) -> int:
+        count = 0
+        for data in chains:
+            self.add_chain(EvolutionChain.from_payload(data))
+            count += 1
+        return count
+
+    def stats(self):
+        return {"chains": len(self.chains), "names": len(self.chain_of)}
+
+
+# Process-wide evolution graph
+graph = EvolutionGraph()
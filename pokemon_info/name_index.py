@@ -0,0 +1,137 @@
+# Import libraries
+import asyncio
+import bisect
+import re
+from pokeapi_client import POKEAPI_BASE_URL, aget_json
+from log_setup import get_logger
+
+logger = get_logger()
+
+# Resource kinds whose names are indexed
+KINDS = ("pokemon", "pokemon-species", "move", "ability")
+
+
+# Canonical PokéAPI spelling of a user supplied name, e.g. "Mr. Mime" -> "mr-mime"
+def normalize(name: str) -> str:
+    name = name.strip().lower()
+    name = re.sub(r"[.'’:]", "", name)
+    name = re.sub(r"[\s_]+", "-", name)
+    return re.sub(r"-+", "-", name).strip("-")
+
+
+# Name without separators, e.g. "mrmime"
+def compact(name: str) -> str:
+    return name.replace("-", "")
+
+
+# Edit distance of a and b, or max_distance + 1 once it is known to exceed max_distance
+def levenshtein(a: str, b: str, max_distance: int) -> int:
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+# Padded bigrams of a name, e.g. "mew" -> {"^m", "me", "ew", "w$"}
+def bigrams(name: str) -> set:
+    padded = f"^{name}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+# Bigram inverted index for edit-distance search
+class BigramIndex:
+    def __init__(self, words):
+        self.words = list(words)
+        self.postings = {}
+        for i, word in enumerate(self.words):
+            for gram in bigrams(word):
+                self.postings.setdefault(gram, []).append(i)
+
+    # Words within max_distance, closest first
+    def search(self, word: str, max_distance: int) -> list:
+        grams = bigrams(word)
+        # Every edit removes at most two bigrams of the word
+        threshold = max(1, len(grams) - 2 * max_distance)
+        shared = {}
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        found = []
+        for i, count in shared.items():
+            if count >= threshold:
+                distance = levenshtein(word, self.words[i], max_distance)
+                if distance <= max_distance:
+                    found.append((distance, self.words[i]))
+        return sorted(found)
+
+
+# Sorted names for prefix search, compact aliases and a bigram index for typos
+class NameIndex:
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        self.name_set = set(self.names)
+        self.compact = {compact(name): name for name in self.names}
+        self.grams = BigramIndex(self.names)
+
+    def prefix(self, prefix: str, limit: int = 10) -> list:
+        start = bisect.bisect_left(self.names, prefix)
+        matches = []
+        for name in self.names[start:]:
+            if not name.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(name)
+        return matches
+
+    def fuzzy(self, name: str, limit: int = 5, max_distance: int = None) -> list:
+        if max_distance is None:
+            max_distance = 1 if len(name) <= 4 else 2
+        return self.grams.search(name, max_distance)[:limit]
+
+    # Canonical name or None, plus suggestions when it is not resolved
+    def resolve(self, query: str):
+        name = normalize(query)
+        if name in self.name_set:
+            return name, []
+        if compact(name) in self.compact:
+            return self.compact[compact(name)], []
+        matches = self.fuzzy(name)
+        if len(matches) == 1 or (len(matches) > 1 and matches[0][0] < matches[1][0]):
+            return matches[0][1], []
+        suggestions = [candidate for _, candidate in matches] or self.prefix(name, 5)
+        return None, suggestions
+
+
+# Name indexes per kind, filled in the background at startup
+indexes = {}
+
+
+# Resolve a name of a kind, passes the normalized name through until the index is loaded
+def resolve_name(kind: str, query: str):
+    index = indexes.get(kind)
+    if index is None or query.strip().isdigit():
+        return normalize(query), []
+    return index.resolve(query)
+
+
+async def load_name_index(kind: str):
+    status_code, listing = await aget_json(f"{POKEAPI_BASE_URL}/{kind}?limit=100000", memory=False)
+    if status_code != 200:
+        raise RuntimeError(f"Failed to list '{kind}' names, status code: {status_code}")
+    names = [entry["name"] for entry in listing["results"]]
+    indexes[kind] = await asyncio.to_thread(NameIndex, names)
+    logger.info("Name index for '%s' ready with %s names", kind, len(names))
+
+
+async def load_name_indexes():
+    for kind in KINDS:
+        try:
+            await load_name_index(kind)
+        except Exception as e:
+            logger.error("Failed to build name index for '%s': %s", kind, e)
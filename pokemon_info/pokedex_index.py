@@ -0,0 +1,156 @@
+# Import libraries
+import asyncio
+import numpy as np
+from pokeapi_client import POKEAPI_BASE_URL, aget_json, snapshot
+from records import Pokemon, Species
+from log_setup import get_logger
+
+logger = get_logger()
+
+# Indexed fields and stat columns
+FIELDS = ("abilities", "moves", "types", "egg_groups")
+STAT_NAMES = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+
+
+# Inverted indexes over every Pokémon plus a columnar stat table
+class PokedexIndex:
+    def __init__(self, ids, names, postings, stats):
+        # ids is sorted, stats[:, i] belongs to ids[i]
+        self.ids = ids
+        self.names = names
+        self.postings = postings
+        self.stats = stats
+
+    # Sorted IDs having a value of a field, e.g. ("abilities", "static")
+    def lookup(self, field: str, value: str) -> np.ndarray:
+        return self.postings[field].get(value.strip().lower().replace(" ", "-"), np.empty(0, dtype=np.int32))
+
+    def all_of(self, filters: dict) -> np.ndarray:
+        result = self.ids
+        for field in FIELDS:
+            for value in filters.get(field) or []:
+                result = np.intersect1d(result, self.lookup(field, value), assume_unique=True)
+        return result
+
+    # None when no value is given, so an empty OR group does not filter
+    def any_of(self, filters: dict):
+        result = None
+        for field in FIELDS:
+            for value in filters.get(field) or []:
+                ids = self.lookup(field, value)
+                result = ids if result is None else np.union1d(result, ids)
+        return result
+
+    def stat_mask(self, ids: np.ndarray, ranges: dict) -> np.ndarray:
+        rows = np.searchsorted(self.ids, ids)
+        mask = np.ones(len(ids), dtype=bool)
+        for stat, bounds in ranges.items():
+            column = self.stats[STAT_NAMES.index(stat), rows]
+            if bounds.get("min") is not None:
+                mask &= column >= bounds["min"]
+            if bounds.get("max") is not None:
+                mask &= column <= bounds["max"]
+        return mask
+
+    # AND/OR filters with stat-range predicates, returns matching IDs
+    def query(self, all_of: dict = None, any_of: dict = None, stats: dict = None) -> np.ndarray:
+        ids = self.all_of(all_of or {})
+        alternatives = self.any_of(any_of or {})
+        if alternatives is not None:
+            ids = np.intersect1d(ids, alternatives, assume_unique=True)
+        if stats:
+            ids = ids[self.stat_mask(ids, stats)]
+        return ids
+
+    def stats_summary(self):
+        return {
+            "pokemon": int(len(self.ids)),
+            **{field: len(self.postings[field]) for field in FIELDS},
+        }
+
+
+# Collects postings while crawling, then freezes them into sorted arrays
+class PokedexIndexBuilder:
+    def __init__(self):
+        self.names = {}
+        self.postings = {field: {} for field in FIELDS}
+        self.stats = {}
+        self.species_of = {}
+        self.egg_groups_of_species = {}
+
+    def _post(self, field: str, value: str, pokemon_id: int):
+        self.postings[field].setdefault(value, []).append(pokemon_id)
+
+    def add_pokemon(self, pokemon: Pokemon):
+        pokemon_id = pokemon.id
+        self.names[pokemon_id] = pokemon.name
+        for ability in pokemon.abilities:
+            self._post("abilities", ability, pokemon_id)
+        for move in pokemon.moves:
+            self._post("moves", move, pokemon_id)
+        for type_name in pokemon.types:
+            self._post("types", type_name, pokemon_id)
+        by_name = dict(pokemon.stats)
+        self.stats[pokemon_id] = [by_name.get(stat, 0) for stat in STAT_NAMES]
+        self.species_of[pokemon_id] = pokemon.species
+
+    def add_species(self, species: Species):
+        self.egg_groups_of_species[species.name] = list(species.egg_groups)
+
+    def build(self) -> PokedexIndex:
+        for pokemon_id, species in self.species_of.items():
+            for group in self.egg_groups_of_species.get(species, []):
+                self._post("egg_groups", group, pokemon_id)
+        ids = np.array(sorted(self.names), dtype=np.int32)
+        stats = np.array([self.stats[i] for i in ids.tolist()], dtype=np.int16).reshape(len(ids), len(STAT_NAMES)).T
+        postings = {
+            field: {value: np.unique(np.asarray(found, dtype=np.int32)) for value, found in values.items()}
+            for field, values in self.postings.items()
+        }
+        return PokedexIndex(ids, dict(self.names), postings, stats)
+
+
+# Build the index from the snapshot, or crawl PokéAPI with bounded concurrency
+async def build_pokedex_index(concurrency: int = 20) -> PokedexIndex:
+    builder = PokedexIndexBuilder()
+    if snapshot is not None:
+        for data in snapshot.iter_kind("pokemon"):
+            builder.add_pokemon(Pokemon.from_payload(data))
+        for data in snapshot.iter_kind("pokemon-species"):
+            builder.add_species(Species.from_payload(data))
+        return builder.build()
+    status_code, listing = await aget_json(f"{POKEAPI_BASE_URL}/pokemon?limit=100000")
+    if status_code != 200:
+        raise RuntimeError(f"Failed to list Pokémon, status code: {status_code}")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(url):
+        async with semaphore:
+            return await aget_json(url, memory=False)
+
+    species_urls = set()
+    for status_code, data in await asyncio.gather(*(fetch(entry["url"]) for entry in listing["results"])):
+        if status_code == 200:
+            builder.add_pokemon(data)
+            species_urls.add(data.species_url)
+    for status_code, data in await asyncio.gather(*(fetch(url) for url in species_urls)):
+        if status_code == 200:
+            builder.add_species(data)
+    return builder.build()
+
+
+_index = None
+
+
+# Process-wide index, None until it is built
+def get_pokedex_index():
+    return _index
+
+
+async def load_pokedex_index():
+    global _index
+    try:
+        _index = await build_pokedex_index()
+        logger.info("Pokédex index ready: %s", _index.stats_summary())
+    except Exception as e:
+        logger.error("Failed to build Pokédex index: %s", e)
@@ -1,181 +1,185 @@
 # Import libraries
-import requests
-import logging
-import sys
+from pokeapi_client import aget_json, resource_url
+from evolution_graph import graph, tree_species
+from pokedex_index import get_pokedex_index
+from name_index import resolve_name
+from log_setup import get_logger
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+logger = get_logger("lookup", sample_rate=0.1)
+
+
+# Resolve a name against the local name index, returns (name, error)
+def resolve_lookup(kind: str, name: str, label: str):
+    resolved, suggestions = resolve_name(kind, name)
+    if resolved is not None:
+        if resolved != name:
+            logger.info("Resolved %s name '%s' to '%s'", label, name, resolved)
+        return resolved, None
+    detail = f"{label} '{name}' not found."
+    if suggestions:
+        detail += f" Did you mean: {', '.join(suggestions)}?"
+    logger.error(detail)
+    return None, {'status_code': 404, 'detail': detail}
 
 
 # Fetch information of Pokemon
-def fetch_pokemon_info(pokemon_name: str):
-    logger.info(f"Fetching basic info for Pokémon: {pokemon_name}")
-    url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.error(f"Failed to fetch info for {pokemon_name}: Status Code {response.status_code}")
+async def fetch_pokemon_info(pokemon_name: str):
+    pokemon_name, error = resolve_lookup("pokemon", pokemon_name, "Pokémon")
+    if error:
+        return error
+    logger.info("Fetching basic info for Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+    if status_code != 200:
+        logger.error("Failed to fetch info for %s: Status Code %s", pokemon_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    data = response.json()
-    logger.info(f"Successfully fetched info for Pokémon: {pokemon_name}")
-    info = {
-        "Name": data["name"].capitalize(),
-        "ID": data["id"],
-        "Height": f'{data["height"] / 10} m',
-        "Weight": f'{data["weight"] / 10} kg',
-        "Types": [t["type"]["name"].capitalize() for t in data["types"]],
-        "Abilities": [a["ability"]["name"].replace('-', ' ').capitalize()
-                      for a in data["abilities"]],
-        "Base Stats": {
-            stat["stat"]["name"].capitalize(): stat["base_stat"]
-            for stat in data["stats"]
-        }
-    }
-    return info
-
-
-# Evolution chain of a Pokemon
-def get_evolution_chain_of_pokemon(pokemon_name: str):
-    logger.info(f"Fetching evolution chain for Pokémon: {pokemon_name}")
-    res = requests.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}")
-    if res.status_code != 200:
-        logger.error(f"Failed to fetch Pokémon data: {pokemon_name}, Status Code: {res.status_code}")
+    logger.info("Successfully fetched info for Pokémon: %s", pokemon_name)
+    return data.info()
+
+
+# Evolution tree of a Pokemon, filled lazily into the evolution graph
+async def get_evolution_tree_of_pokemon(pokemon_name: str):
+    pokemon_name, error = resolve_lookup("pokemon", pokemon_name, "Pokémon")
+    if error:
+        return error
+    tree = graph.tree_for(pokemon_name)
+    if tree is not None:
+        return tree
+    logger.info("Fetching evolution chain for Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+    if status_code != 200:
+        logger.error("Failed to fetch Pokémon data: %s, Status Code: %s", pokemon_name, status_code)
         return {
-            'status_code': res.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    species_url = res.json()["species"]["url"]
-    species_data = requests.get(species_url).json()
-    evolution_url = species_data["evolution_chain"]["url"]
-    logger.info(f"Fetched evolution chain URL: {evolution_url}")
-
-    def extract_chain(chain):
-        names = []
-        while chain:
-            names.append(chain["species"]["name"].capitalize())
-            if chain["evolves_to"]:
-                chain = chain["evolves_to"][0]
+    chain_id = graph.chain_id_for(data.species)
+    if chain_id is None:
+        status_code, species_data = await aget_json(data.species_url)
+        if status_code == 200:
+            if species_data.evolution_chain_url is None:
+                status_code = 404
             else:
-                break
-        return names
-
-    evolution_chain_data = requests.get(evolution_url).json()
-    chain = extract_chain(evolution_chain_data["chain"])
-    logger.info(f"Evolution chain for {pokemon_name}: {chain}")
-    return chain
+                status_code, evolution_chain = await aget_json(species_data.evolution_chain_url)
+        if status_code != 200:
+            logger.error("Failed to fetch evolution chain: %s, Status Code: %s", pokemon_name, status_code)
+            return {
+                'status_code': status_code,
+                'detail': f"Evolution chain of '{pokemon_name}' not found."
+            }
+        chain_id = graph.add_chain(evolution_chain)
+    graph.alias(pokemon_name, chain_id)
+    logger.info("Evolution chain %s resolved for %s", chain_id, pokemon_name)
+    return graph.chains[chain_id]
+
+
+# Evolution chain of a Pokemon, every branch included
+async def get_evolution_chain_of_pokemon(pokemon_name: str):
+    tree = await get_evolution_tree_of_pokemon(pokemon_name)
+    if "status_code" in tree:
+        return tree
+    return [name.capitalize() for name in tree_species(tree)]
 
 
 # Get pokemons by ability
-def get_pokemons_by_ability(ability_name: str):
-    logger.info(f"Fetching Pokémon list with ability: {ability_name}")
-    url = f"https://pokeapi.co/api/v2/ability/{ability_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.error(f"Ability '{ability_name}' not found. Status Code: {response.status_code}")
+async def get_pokemons_by_ability(ability_name: str):
+    ability_name, error = resolve_lookup("ability", ability_name, "Ability")
+    if error:
+        return error
+    index = get_pokedex_index()
+    if index is not None:
+        ids = index.lookup("abilities", ability_name)
+        if len(ids):
+            return [index.names[i] for i in ids.tolist()]
+    logger.info("Fetching Pokémon list with ability: %s", ability_name)
+    status_code, data = await aget_json(resource_url("ability", ability_name))
+    if status_code != 200:
+        logger.error("Ability '%s' not found. Status Code: %s", ability_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Ability '{ability_name}' not found."
         }
-    data = response.json()
-    pokemon_list = [entry['pokemon']['name'] for entry in data['pokemon']]
-    logger.info(f"Found {len(pokemon_list)} Pokémon with ability '{ability_name}'")
+    pokemon_list = list(data.pokemon)
+    logger.info("Found %s Pokémon with ability '%s'", len(pokemon_list), ability_name)
     return pokemon_list
 
 
 # Get move details of pokemon
-def get_move_details_of_pokemon(move_name: str):
-    logger.info(f"Fetching move details for: {move_name}")
-    url = f"https://pokeapi.co/api/v2/move/{move_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.error(f"Move '{move_name}' not found. Status Code: {response.status_code}")
+async def get_move_details_of_pokemon(move_name: str):
+    move_name, error = resolve_lookup("move", move_name, "Move")
+    if error:
+        return error
+    logger.info("Fetching move details for: %s", move_name)
+    status_code, data = await aget_json(resource_url("move", move_name))
+    if status_code != 200:
+        logger.error("Move '%s' not found. Status Code: %s", move_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Move '{move_name}' not found."
         }
-    data = response.json()
-    move_info = {
-        "name": data["name"],
-        "type": data["type"]["name"],
-        "power": data["power"],
-        "accuracy": data["accuracy"],
-        "pp": data["pp"],
-        "damage_class": data["damage_class"]["name"],
-        "effect": None
-    }
-    for entry in data["effect_entries"]:
-        if entry["language"]["name"] == "en":
-            move_info["effect"] = entry["short_effect"]
-            break
-    logger.info(f"Move details for '{move_name}': {move_info}")
+    move_info = data.details()
+    logger.info("Move details for '%s': %s", move_name, move_info)
     return move_info
 
 
-# Get species details of Pokemon
-def get_species_details_of_pokemon(pokemon_name):
-    logger.info(f"Fetching species details for: {pokemon_name}")
-    url = f"https://pokeapi.co/api/v2/pokemon-species/{pokemon_name.lower()}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        logger.error(f"Species details for '{pokemon_name}' not found. Status Code: {response.status_code}")
+# Get species details of Pokemon. Forms such as raichu-alola have no species of their own,
+# so names the species index or PokéAPI does not know go through the pokemon record's species link
+async def get_species_details_of_pokemon(pokemon_name):
+    species_name, _ = resolve_name("pokemon-species", pokemon_name)
+    if species_name is not None:
+        logger.info("Fetching species details for: %s", species_name)
+        status_code, data = await aget_json(resource_url("pokemon-species", species_name))
+        if status_code == 200:
+            logger.info("Species details fetched for '%s'", species_name)
+            return data.details()
+        if status_code != 404:
+            logger.error("Failed to fetch species details: %s, Status Code: %s", species_name, status_code)
+            return {
+                'status_code': status_code,
+                'detail': f"Pokémon '{species_name}' not found."
+            }
+    pokemon_name, error = resolve_lookup("pokemon", pokemon_name, "Pokémon")
+    if error:
+        return error
+    logger.info("Fetching species details through Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+    if status_code == 200:
+        status_code, data = await aget_json(data.species_url)
+    if status_code != 200:
+        logger.error("Species details for '%s' not found. Status Code: %s", pokemon_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
-    data = response.json()
-    flavor_text = None
-    for entry in data["flavor_text_entries"]:
-        if entry["language"]["name"] == "en":
-            flavor_text = entry["flavor_text"].replace('\n', ' ').replace('\f', ' ')
-            break
-    logger.info(f"Species details fetched for '{pokemon_name}'")
-    return {
-        "name": data["name"],
-        "is_legendary": data["is_legendary"],
-        "is_mythical": data["is_mythical"],
-        "capture_rate": data["capture_rate"],
-        "base_happiness": data["base_happiness"],
-        "gender_rate": data["gender_rate"],
-        "egg_groups": [group["name"] for group in data["egg_groups"]],
-        "evolution_chain_url": data["evolution_chain"]["url"],
-        "flavor_text": flavor_text
-    }
+    logger.info("Species details fetched for '%s'", pokemon_name)
+    return data.details()
 
 
 # Get habitat of Pokemon
-def get_pokemon_habitat(pokemon_name):
-    logger.info(f"Fetching habitat for Pokémon: {pokemon_name}")
-    base_url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-    response = requests.get(base_url)
-    if response.status_code != 200:
-        logger.error(f"Failed to fetch Pokémon data: {pokemon_name}, Status Code: {response.status_code}")
+async def get_pokemon_habitat(pokemon_name):
+    pokemon_name, error = resolve_lookup("pokemon", pokemon_name, "Pokémon")
+    if error:
+        return error
+    logger.info("Fetching habitat for Pokémon: %s", pokemon_name)
+    status_code, data = await aget_json(resource_url("pokemon", pokemon_name))
+    if status_code != 200:
+        logger.error("Failed to fetch Pokémon data: %s, Status Code: %s", pokemon_name, status_code)
         return {
-            'status_code': response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
 
-    species_url = response.json()["species"]["url"]
-    species_response = requests.get(species_url)
-    if species_response.status_code != 200:
-        logger.error(f"Failed to fetch species data for: {pokemon_name}, Status Code: {species_response.status_code}")
+    status_code, species_data = await aget_json(data.species_url)
+    if status_code != 200:
+        logger.error("Failed to fetch species data for: %s, Status Code: %s", pokemon_name, status_code)
         return {
-            'status_code': species_response.status_code,
+            'status_code': status_code,
             'detail': f"Pokémon '{pokemon_name}' not found."
         }
 
-    species_data = species_response.json()
-    habitat = species_data.get("habitat")
-    result = habitat["name"] if habitat else "No specific habitat (possibly legendary or event Pokémon)."
-    logger.info(f"Habitat for {pokemon_name}: {result}")
+    result = species_data.habitat_name()
+    logger.info("Habitat for %s: %s", pokemon_name, result)
     return result
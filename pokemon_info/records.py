@@ -0,0 +1,318 @@
+# Import libraries
+from dataclasses import dataclass
+from sys import intern
+
+# Typed records of the PokéAPI resources the services read, parsed once when a payload arrives.
+# The in-process cache holds these records; to_payload gives a compact PokéAPI-shaped dict for the
+# shared cache tier, which parses back into the same record.
+# Names shared by many records (types, stats, moves, ...) are interned so cached copies share one string.
+
+
+def _name(ref: dict):
+    return intern(ref["name"]) if ref else None
+
+
+def _ref(name: str):
+    return {"name": name} if name is not None else None
+
+
+# First English entry of a localized list, e.g. flavor_text_entries
+def _english(entries: list, field: str):
+    for entry in entries or []:
+        if entry["language"]["name"] == "en":
+            return entry[field]
+    return None
+
+
+def _english_entries(field: str, text: str) -> list:
+    return [{field: text, "language": {"name": "en"}}] if text is not None else []
+
+
+@dataclass(slots=True)
+class Pokemon:
+    id: int
+    name: str
+    height: int
+    weight: int
+    species: str
+    species_url: str
+    # Type names in slot order, (stat name, base stat) pairs, ability and learnable move names
+    types: tuple
+    stats: tuple
+    abilities: tuple
+    moves: tuple
+
+    @classmethod
+    def from_payload(cls, data: dict):
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            height=data["height"],
+            weight=data["weight"],
+            species=data["species"]["name"],
+            species_url=data["species"]["url"],
+            types=tuple(_name(t["type"]) for t in sorted(data["types"], key=lambda t: t["slot"])),
+            stats=tuple((_name(s["stat"]), s["base_stat"]) for s in data["stats"]),
+            abilities=tuple(_name(a["ability"]) for a in data["abilities"]),
+            moves=tuple(_name(m["move"]) for m in data.get("moves", [])),
+        )
+
+    def to_payload(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "height": self.height,
+            "weight": self.weight,
+            "species": {"name": self.species, "url": self.species_url},
+            "types": [{"slot": slot, "type": {"name": name}} for slot, name in enumerate(self.types, 1)],
+            "stats": [{"base_stat": base, "stat": {"name": name}} for name, base in self.stats],
+            "abilities": [{"ability": {"name": name}} for name in self.abilities],
+            "moves": [{"move": {"name": name}} for name in self.moves],
+        }
+
+    # Pokemon info as served by /pokemon/{name}
+    def info(self) -> dict:
+        return {
+            "Name": self.name.capitalize(),
+            "ID": self.id,
+            "Height": f"{self.height / 10} m",
+            "Weight": f"{self.weight / 10} kg",
+            "Types": [name.capitalize() for name in self.types],
+            "Abilities": [name.replace("-", " ").capitalize() for name in self.abilities],
+            "Base Stats": {name.capitalize(): base for name, base in self.stats},
+        }
+
+
+@dataclass(slots=True)
+class Species:
+    id: int
+    name: str
+    is_legendary: bool
+    is_mythical: bool
+    capture_rate: int
+    base_happiness: int
+    gender_rate: int
+    egg_groups: tuple
+    # None for species without an evolution chain
+    evolution_chain_url: str
+    habitat: str
+    # First English flavor text with line and page breaks flattened
+    flavor_text: str
+
+    @classmethod
+    def from_payload(cls, data: dict):
+        flavor_text = _english(data.get("flavor_text_entries"), "flavor_text")
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            is_legendary=data["is_legendary"],
+            is_mythical=data["is_mythical"],
+            capture_rate=data["capture_rate"],
+            base_happiness=data["base_happiness"],
+            gender_rate=data["gender_rate"],
+            egg_groups=tuple(_name(group) for group in data["egg_groups"]),
+            evolution_chain_url=(data.get("evolution_chain") or {}).get("url"),
+            habitat=_name(data.get("habitat")),
+            flavor_text=flavor_text.replace("\n", " ").replace("\f", " ") if flavor_text is not None else None,
+        )
+
+    def to_payload(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "is_legendary": self.is_legendary,
+            "is_mythical": self.is_mythical,
+            "capture_rate": self.capture_rate,
+            "base_happiness": self.base_happiness,
+            "gender_rate": self.gender_rate,
+            "egg_groups": [{"name": name} for name in self.egg_groups],
+            "habitat": _ref(self.habitat),
+            "flavor_text_entries": _english_entries("flavor_text", self.flavor_text),
+            # Left out when unknown, like in PokéAPI payloads without a chain
+            **({"evolution_chain": {"url": self.evolution_chain_url}} if self.evolution_chain_url else {}),
+        }
+
+    # Species details as served by /species/{name}
+    def details(self) -> dict:
+        return {
+            "name": self.name,
+            "is_legendary": self.is_legendary,
+            "is_mythical": self.is_mythical,
+            "capture_rate": self.capture_rate,
+            "base_happiness": self.base_happiness,
+            "gender_rate": self.gender_rate,
+            "egg_groups": list(self.egg_groups),
+            "evolution_chain_url": self.evolution_chain_url,
+            "flavor_text": self.flavor_text,
+        }
+
+    def habitat_name(self) -> str:
+        return self.habitat or "No specific habitat (possibly legendary or event Pokémon)."
+
+
+@dataclass(slots=True)
+class Move:
+    id: int
+    name: str
+    type: str
+    power: int
+    accuracy: int
+    pp: int
+    # None for moves without a damage class in PokéAPI
+    damage_class: str
+    effect: str
+
+    @classmethod
+    def from_payload(cls, data: dict):
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            type=_name(data["type"]),
+            power=data.get("power"),
+            accuracy=data.get("accuracy"),
+            pp=data.get("pp"),
+            damage_class=_name(data.get("damage_class")),
+            effect=_english(data.get("effect_entries"), "short_effect"),
+        )
+
+    def to_payload(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": {"name": self.type},
+            "power": self.power,
+            "accuracy": self.accuracy,
+            "pp": self.pp,
+            "damage_class": _ref(self.damage_class),
+            "effect_entries": _english_entries("short_effect", self.effect),
+        }
+
+    # Move details as served by /move/{name}
+    def details(self) -> dict:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "power": self.power,
+            "accuracy": self.accuracy,
+            "pp": self.pp,
+            "damage_class": self.damage_class,
+            "effect": self.effect,
+        }
+
+
+@dataclass(slots=True)
+class Type:
+    id: int
+    name: str
+    # damage_relations[relation] is a tuple of type names, e.g. "double_damage_to"
+    damage_relations: dict
+    # (name, url) of every Pokémon having the type
+    pokemon: tuple
+
+    @classmethod
+    def from_payload(cls, data: dict):
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            damage_relations={
+                relation: tuple(_name(target) for target in targets)
+                for relation, targets in data["damage_relations"].items()
+            },
+            pokemon=tuple((entry["pokemon"]["name"], entry["pokemon"]["url"]) for entry in data["pokemon"]),
+        )
+
+    def to_payload(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "damage_relations": {
+                relation: [{"name": name} for name in targets]
+                for relation, targets in self.damage_relations.items()
+            },
+            "pokemon": [{"pokemon": {"name": name, "url": url}} for name, url in self.pokemon],
+        }
+
+
+@dataclass(slots=True)
+class Ability:
+    id: int
+    name: str
+    pokemon: tuple
+
+    @classmethod
+    def from_payload(cls, data: dict):
+        return cls(id=data["id"], name=data["name"], pokemon=tuple(entry["pokemon"]["name"] for entry in data["pokemon"]))
+
+    def to_payload(self) -> dict:
+        return {"id": self.id, "name": self.name, "pokemon": [{"pokemon": {"name": name}} for name in self.pokemon]}
+
+
+# Evolution condition fields from a PokéAPI evolution_details entry
+def parse_evolution_details(details: list) -> list:
+    conditions = []
+    for detail in details:
+        condition = {}
+        for key, value in detail.items():
+            if value is None or value is False or value == "":
+                continue
+            condition[key] = value["name"] if isinstance(value, dict) and "name" in value else value
+        conditions.append(condition)
+    return conditions
+
+
+# Evolution tree node from a PokéAPI chain link
+def parse_chain_link(link: dict) -> dict:
+    return {
+        "species": link["species"]["name"],
+        "is_baby": link.get("is_baby", False),
+        "conditions": parse_evolution_details(link.get("evolution_details", [])),
+        "evolves_to": [parse_chain_link(child) for child in link.get("evolves_to", [])],
+    }
+
+
+# PokéAPI chain link of an evolution tree node, parse_chain_link reads it back unchanged
+def chain_link_payload(tree: dict) -> dict:
+    return {
+        "species": {"name": tree["species"]},
+        "is_baby": tree["is_baby"],
+        "evolution_details": tree["conditions"],
+        "evolves_to": [chain_link_payload(child) for child in tree["evolves_to"]],
+    }
+
+
+@dataclass(slots=True)
+class EvolutionChain:
+    id: int
+    # Evolution tree as built by parse_chain_link
+    tree: dict
+
+    @classmethod
+    def from_payload(cls, data: dict):
+        return cls(id=data["id"], tree=parse_chain_link(data["chain"]))
+
+    def to_payload(self) -> dict:
+        return {"id": self.id, "chain": chain_link_payload(self.tree)}
+
+
+# Record type of each PokéAPI resource type
+RECORDS = {
+    "pokemon": Pokemon,
+    "pokemon-species": Species,
+    "move": Move,
+    "type": Type,
+    "ability": Ability,
+    "evolution-chain": EvolutionChain,
+}
+
+
+# Record of a payload of the given resource type, list queries and other resources pass unchanged
+def parse_record(resource: str, data: dict):
+    record = RECORDS.get(resource)
+    if record is None or "id" not in data:
+        return data
+    return record.from_payload(data)
+
+
+# JSON-ready form of a cached value, for the shared tier
+def to_payload(value):
+    return value.to_payload() if isinstance(value, tuple(RECORDS.values())) else value
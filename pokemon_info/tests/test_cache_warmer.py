@@ -0,0 +1,53 @@
+import asyncio
+import cache_warmer
+from cache_warmer import CacheWarmer
+from pokeapi_cache import ResponseCache, SQLiteBackend
+from pokeapi_client import POKEAPI_BASE_URL
+
+
+def test_refresh_skips_entries_the_shared_tier_still_holds(monkeypatch, tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    cache = ResponseCache(backend=backend)
+    monkeypatch.setattr(cache_warmer, "cache", cache)
+    monkeypatch.setattr(cache_warmer, "WARM_REFRESH_MARGIN", 3600)
+    url = f"{POKEAPI_BASE_URL}/"
+    # Fresh in memory
+    cache.set(url + "pokemon/pikachu", {}, ttl=7200)
+    # Expiring in memory, refreshed in the shared tier by another replica
+    cache.set(url + "pokemon/eevee", {}, ttl=60)
+    cache.set(url + "pokemon/eevee", {}, ttl=7200, memory=False)
+    # Only in the shared tier, still fresh
+    cache.set(url + "type/fire", {}, ttl=7200, memory=False)
+    # Expiring in both tiers
+    cache.set(url + "pokemon/gengar", {}, ttl=60)
+    # Not cached at all
+
+    warmer = CacheWarmer(["pokemon/pikachu", "pokemon/eevee", "type/fire", "pokemon/gengar", "move/tackle"])
+    fetched = []
+
+    async def fetch(path, refresh=False):
+        fetched.append((path, refresh))
+        return True
+
+    monkeypatch.setattr(warmer, "_fetch", fetch)
+    asyncio.run(warmer.refresh_expiring())
+    assert fetched == [("pokemon/gengar", True), ("move/tackle", True)]
+    assert warmer.refreshed == 2
+
+
+def test_refresh_falls_back_to_memory_without_a_shared_tier(monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(cache_warmer, "cache", cache)
+    monkeypatch.setattr(cache_warmer, "WARM_REFRESH_MARGIN", 3600)
+    cache.set(f"{POKEAPI_BASE_URL}/pokemon/pikachu", {}, ttl=7200)
+    cache.set(f"{POKEAPI_BASE_URL}/pokemon/eevee", {}, ttl=60)
+    warmer = CacheWarmer(["pokemon/pikachu", "pokemon/eevee"])
+    fetched = []
+
+    async def fetch(path, refresh=False):
+        fetched.append(path)
+        return True
+
+    monkeypatch.setattr(warmer, "_fetch", fetch)
+    asyncio.run(warmer.refresh_expiring())
+    assert fetched == ["pokemon/eevee"]
@@ -0,0 +1,56 @@
+import name_index
+from name_index import NameIndex, levenshtein, normalize, resolve_name
+
+NAMES = ["pikachu", "pichu", "raichu", "raichu-alola", "mr-mime", "mew", "mewtwo", "charmander", "charmeleon", "charizard"]
+
+
+def test_levenshtein_distances_and_cutoff():
+    assert levenshtein("pikachu", "pikachu", 2) == 0
+    assert levenshtein("pikachoo", "pikachu", 2) == 2
+    assert levenshtein("pichu", "pikachu", 2) == 2
+    assert levenshtein("mew", "mewtwo", 2) == 3
+    assert levenshtein("charmander", "bulbasaur", 2) == 3
+
+
+def test_normalize_matches_pokeapi_spelling():
+    assert normalize(" Mr. Mime ") == "mr-mime"
+    assert normalize("Farfetch’d") == "farfetchd"
+    assert normalize("raichu_alola") == "raichu-alola"
+
+
+def test_prefix_lists_names_in_order():
+    index = NameIndex(NAMES)
+    assert index.prefix("char") == ["charizard", "charmander", "charmeleon"]
+    assert index.prefix("mew", limit=1) == ["mew"]
+    assert index.prefix("zzz") == []
+
+
+def test_resolve_exact_compact_and_typos():
+    index = NameIndex(NAMES)
+    assert index.resolve("Pikachu") == ("pikachu", [])
+    assert index.resolve("Mr Mime") == ("mr-mime", [])
+    assert index.resolve("mrmime") == ("mr-mime", [])
+    assert index.resolve("pikahcu") == ("pikachu", [])
+    assert index.resolve("charizrd") == ("charizard", [])
+
+
+def test_ambiguous_or_unknown_names_return_suggestions():
+    index = NameIndex(NAMES)
+    resolved, suggestions = index.resolve("charm")
+    assert resolved is None
+    assert suggestions == ["charmander", "charmeleon"]
+    assert index.resolve("bulbasaur") == (None, [])
+
+
+def test_short_names_allow_a_single_typo():
+    index = NameIndex(NAMES)
+    assert index.resolve("mev") == ("mew", [])
+    assert index.fuzzy("mxx") == []
+
+
+def test_resolve_name_passes_names_through_until_the_index_loads(monkeypatch):
+    monkeypatch.setattr(name_index, "indexes", {})
+    assert resolve_name("pokemon", " Pikachoo ") == ("pikachoo", [])
+    monkeypatch.setattr(name_index, "indexes", {"pokemon": NameIndex(NAMES)})
+    assert resolve_name("pokemon", " Pikachoo ") == ("pikachu", [])
+    assert resolve_name("pokemon", "25") == ("25", [])
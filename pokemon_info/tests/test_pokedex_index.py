@@ -0,0 +1,81 @@
+from pokedex_index import PokedexIndexBuilder
+from records import Pokemon, Species
+
+
+def pokemon(pokemon_id, name, types, abilities, moves, speed, species=None):
+    return Pokemon(
+        id=pokemon_id, name=name, height=1, weight=1, species=species or name, species_url="",
+        types=tuple(types), stats=(("hp", 50), ("speed", speed)), abilities=tuple(abilities), moves=tuple(moves),
+    )
+
+
+def species(name, egg_groups):
+    return Species(
+        id=0, name=name, is_legendary=False, is_mythical=False, capture_rate=45, base_happiness=50,
+        gender_rate=4, egg_groups=tuple(egg_groups), evolution_chain_url=None, habitat=None, flavor_text=None,
+    )
+
+
+def build_index():
+    builder = PokedexIndexBuilder()
+    for record in (
+        pokemon(25, "pikachu", ["electric"], ["static", "lightning-rod"], ["thunderbolt", "quick-attack"], 90),
+        pokemon(26, "raichu", ["electric"], ["static"], ["thunderbolt"], 110),
+        pokemon(94, "gengar", ["ghost", "poison"], ["cursed-body"], ["shadow-ball", "thunderbolt"], 110),
+        pokemon(131, "lapras", ["water", "ice"], ["water-absorb"], ["surf", "thunderbolt"], 60),
+        pokemon(143, "snorlax", ["normal"], ["thick-fat"], ["body-slam"], 30),
+        pokemon(10100, "raichu-alola", ["electric", "psychic"], ["surge-surfer"], ["psychic"], 110, species="raichu"),
+    ):
+        builder.add_pokemon(record)
+    builder.add_species(species("pikachu", ["ground", "fairy"]))
+    builder.add_species(species("raichu", ["ground", "fairy"]))
+    builder.add_species(species("lapras", ["monster", "water1"]))
+    return builder.build()
+
+
+def names(index, ids):
+    return [index.names[pokemon_id] for pokemon_id in ids.tolist()]
+
+
+def test_all_of_intersects_every_value():
+    index = build_index()
+    assert names(index, index.query(all_of={"types": ["electric"], "abilities": ["static"]})) == ["pikachu", "raichu"]
+    assert names(index, index.query(all_of={"moves": ["thunderbolt"], "types": ["ghost"]})) == ["gengar"]
+    assert names(index, index.query(all_of={"types": ["electric", "ghost"]})) == []
+
+
+def test_any_of_unions_values_across_fields():
+    index = build_index()
+    assert names(index, index.query(any_of={"types": ["water", "ice"]})) == ["lapras"]
+    assert names(index, index.query(any_of={"types": ["ghost"], "abilities": ["thick-fat"]})) == ["gengar", "snorlax"]
+
+
+def test_all_of_and_any_of_combine():
+    index = build_index()
+    ids = index.query(all_of={"moves": ["thunderbolt"]}, any_of={"types": ["water", "ghost"]})
+    assert names(index, ids) == ["gengar", "lapras"]
+
+
+def test_empty_filters_match_everything_and_unknown_values_nothing():
+    index = build_index()
+    assert len(index.query()) == 6
+    assert len(index.query(any_of={})) == 6
+    assert len(index.query(all_of={"abilities": ["no-such-ability"]})) == 0
+    assert len(index.query(any_of={"abilities": ["no-such-ability"]})) == 0
+
+
+def test_values_are_normalized_before_lookup():
+    index = build_index()
+    assert names(index, index.query(all_of={"abilities": [" Lightning Rod "]})) == ["pikachu"]
+
+
+def test_egg_groups_come_from_species_and_forms_share_them():
+    index = build_index()
+    assert names(index, index.query(all_of={"egg_groups": ["fairy"]})) == ["pikachu", "raichu", "raichu-alola"]
+
+
+def test_stat_ranges_filter_the_matches():
+    index = build_index()
+    ids = index.query(all_of={"moves": ["thunderbolt"]}, stats={"speed": {"min": 90, "max": 110}})
+    assert names(index, ids) == ["pikachu", "raichu", "gengar"]
+    assert names(index, index.query(stats={"speed": {"max": 60}})) == ["lapras", "snorlax"]
@@ -0,0 +1,65 @@
+import asyncio
+import name_index
+import pokemon_info
+from name_index import NameIndex
+from records import parse_record
+
+BASE = "https://pokeapi.co/api/v2"
+RAICHU = {
+    "id": 26, "name": "raichu", "is_legendary": False, "is_mythical": False, "capture_rate": 75,
+    "base_happiness": 50, "gender_rate": 4, "egg_groups": [{"name": "ground"}, {"name": "fairy"}],
+    "evolution_chain": {"url": f"{BASE}/evolution-chain/10/"}, "habitat": {"name": "forest"},
+    "flavor_text_entries": [],
+}
+RAICHU_ALOLA = {
+    "id": 10100, "name": "raichu-alola", "height": 7, "weight": 210,
+    "species": {"name": "raichu", "url": f"{BASE}/pokemon-species/26/"},
+    "types": [{"slot": 1, "type": {"name": "electric"}}, {"slot": 2, "type": {"name": "psychic"}}],
+    "stats": [], "abilities": [], "moves": [],
+}
+RESPONSES = {
+    f"{BASE}/pokemon-species/raichu": ("pokemon-species", RAICHU),
+    f"{BASE}/pokemon-species/26/": ("pokemon-species", RAICHU),
+    f"{BASE}/pokemon/raichu-alola": ("pokemon", RAICHU_ALOLA),
+}
+
+
+def fake_pokeapi(monkeypatch):
+    requested = []
+
+    async def aget_json(url, **kwargs):
+        requested.append(url)
+        if url not in RESPONSES:
+            return 404, None
+        resource, data = RESPONSES[url]
+        return 200, parse_record(resource, data)
+
+    monkeypatch.setattr(pokemon_info, "aget_json", aget_json)
+    monkeypatch.setattr(pokemon_info, "resource_url", lambda resource, name: f"{BASE}/{resource}/{name}")
+    return requested
+
+
+def test_species_of_a_form_follows_the_pokemon_species_link(monkeypatch):
+    requested = fake_pokeapi(monkeypatch)
+    monkeypatch.setattr(name_index, "indexes", {
+        "pokemon": NameIndex(["raichu", "raichu-alola"]),
+        "pokemon-species": NameIndex(["raichu"]),
+    })
+    details = asyncio.run(pokemon_info.get_species_details_of_pokemon("raichu-alola"))
+    assert details["name"] == "raichu"
+    assert requested == [f"{BASE}/pokemon/raichu-alola", f"{BASE}/pokemon-species/26/"]
+
+
+def test_species_of_a_form_before_the_name_indexes_load(monkeypatch):
+    requested = fake_pokeapi(monkeypatch)
+    monkeypatch.setattr(name_index, "indexes", {})
+    details = asyncio.run(pokemon_info.get_species_details_of_pokemon("raichu-alola"))
+    assert details["name"] == "raichu"
+    assert requested[0] == f"{BASE}/pokemon-species/raichu-alola"
+
+
+def test_species_lookup_of_an_unknown_name(monkeypatch):
+    fake_pokeapi(monkeypatch)
+    monkeypatch.setattr(name_index, "indexes", {})
+    result = asyncio.run(pokemon_info.get_species_details_of_pokemon("missingno"))
+    assert result["status_code"] == 404
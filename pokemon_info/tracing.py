@@ -0,0 +1,121 @@
+# Import libraries
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from contextlib import nullcontext
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter, SpanExportResult
+from opentelemetry.trace import SpanKind
+from starlette.requests import Request
+
+# Tracing settings, exporter is one of none, otlp, file or console
+TRACE_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+# Adds a Server-Timing header with the span breakdown of each request
+TRACE_DEBUG = os.getenv("TRACE_DEBUG", "0") == "1"
+
+tracer = trace.get_tracer("pokemon")
+
+# Spans finished while serving the current request, set only in debug mode
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+# Appends finished spans as JSON lines to a local file
+class FileSpanExporter(SpanExporter):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = [json.dumps(json.loads(span.to_json()), separators=(",", ":")) for span in spans]
+        with self._lock, open(self.path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+        return SpanExportResult.SUCCESS
+
+
+# Records span durations into the current request's timing list
+class RequestTimingProcessor(SpanProcessor):
+    def on_end(self, span):
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((span.name, (span.end_time - span.start_time) / 1e6))
+
+
+def _exporter():
+    if TRACE_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if TRACE_EXPORTER == "file":
+        return FileSpanExporter(TRACE_FILE)
+    if TRACE_EXPORTER == "console":
+        return ConsoleSpanExporter()
+    return None
+
+
+# Install the process-wide tracer provider, a no-op unless an exporter or debug mode is set
+def setup_tracing(service_name: str):
+    exporter = _exporter()
+    if exporter is None and not TRACE_DEBUG:
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)}))
+    if exporter is not None:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    if TRACE_DEBUG:
+        provider.add_span_processor(RequestTimingProcessor())
+    trace.set_tracer_provider(provider)
+
+
+# Headers carrying the current trace context to a downstream service
+def inject_headers(headers: dict = None) -> dict:
+    headers = dict(headers or {})
+    propagate.inject(headers)
+    return headers
+
+
+# Server-Timing value, span durations summed per span name
+def server_timing(timings: list, total_ms: float) -> str:
+    totals = {}
+    for name, duration in timings:
+        token = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+        count, summed = totals.get(token, (0, 0.0))
+        totals[token] = (count + 1, summed + duration)
+    entries = [f'{token};dur={summed:.1f};desc="x{count}"' for token, (count, summed) in totals.items()]
+    return ", ".join(entries + [f"total;dur={total_ms:.1f}"])
+
+
+# Server span per request, continuing the caller's trace context
+def install_tracing(app, service_name: str):
+    setup_tracing(service_name)
+
+    @app.middleware("http")
+    async def trace_request(request: Request, call_next):
+        context = propagate.extract(request.headers)
+        token = _request_timings.set([]) if TRACE_DEBUG else None
+        start = time.perf_counter()
+        current = trace.get_current_span()
+        # Reuse the server span when the framework already opened one
+        if current.is_recording():
+            server_span = nullcontext(current)
+        else:
+            server_span = tracer.start_as_current_span(
+                f"{request.method} {request.url.path}", context=context, kind=SpanKind.SERVER,
+            )
+        try:
+            with server_span as span:
+                response = await call_next(request)
+                route = request.scope.get("route")
+                if route is not None:
+                    span.update_name(f"{request.method} {route.path}")
+                span.set_attribute("http.status_code", response.status_code)
+            if token is not None:
+                total_ms = (time.perf_counter() - start) * 1000
+                response.headers["Server-Timing"] = server_timing(_request_timings.get(), total_ms)
+            return response
+        finally:
+            if token is not None:
+                _request_timings.reset(token)
@@ -0,0 +1,38 @@
+# Import libraries
+from urllib.parse import urlsplit
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Payload size buckets in bytes, 100 B to 1 MB
+SIZE_BUCKETS = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)
+
+# Backend service call metrics, labelled by endpoint path
+SERVICE_LATENCY = Histogram(
+    "service_call_duration_seconds", "Latency of backend service calls including retries",
+    ["endpoint", "status"],
+)
+SERVICE_RETRIES = Counter(
+    "service_call_retries_total", "Backend service call retries by reason",
+    ["endpoint", "reason"],
+)
+SERVICE_RESPONSE_SIZE = Histogram(
+    "service_response_size_bytes", "Size of backend service response bodies",
+    ["endpoint"], buckets=SIZE_BUCKETS,
+)
+SERVICE_IN_FLIGHT = Gauge(
+    "service_calls_in_flight", "Backend service calls currently waiting for a response",
+    ["endpoint"],
+)
+
+
+# Metric label of a backend endpoint URL, e.g. "/pokemon-info"
+def endpoint_label(endpoint: str) -> str:
+    return urlsplit(endpoint).path or "/"
+
+
+# Add GET /metrics to the MCP server's HTTP transports
+def install_metrics(mcp):
+    @mcp.custom_route("/metrics", methods=["GET"], include_in_schema=False)
+    async def metrics(request: Request) -> Response:
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,72 +1,148 @@
 # Import libraries
-from fastmcp import FastMCP
-import requests
-import logging
-import sys
+from fastmcp import Context, FastMCP
+from service_client import BudgetExceeded, close_clients, loads, post_with_retries, request_deadline, stream_json_lines
+from metrics import SERVICE_IN_FLIGHT, SERVICE_LATENCY, SERVICE_RESPONSE_SIZE, endpoint_label, install_metrics
+from tracing import inject_headers, setup_tracing, tracer
+from log_setup import get_logger
+from opentelemetry.trace import SpanKind
+import asyncio
+import httpx
+import os
+import time
+from contextlib import asynccontextmanager
 
 from typing import Annotated, Literal
-from pydantic import Field
+from pydantic import BaseModel, Field
 
 # Logger setup
-logger = logging.getLogger("pokemon-info-logger")
-logger.setLevel(logging.INFO)
-if not logger.handlers:
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-
-# Define service DNS
-namespace = "pokemon"
-pokemon_info_url = f"http://pokemon-info-service.{namespace}"
-pokemon_compare_url = f"http://pokemon-compare-service.{namespace}/pokemon-compare/"
-counter_pokemon_url = f"http://counter-pokemon-service.{namespace}/counter-pokemon/"
+logger = get_logger()
+
+# Define service DNS, overridable to run against local services
+namespace = os.getenv("POKEMON_NAMESPACE", "pokemon")
+pokemon_info_url = os.getenv("POKEMON_INFO_URL", f"http://pokemon-info-service.{namespace}")
+pokemon_compare_service_url = os.getenv("POKEMON_COMPARE_URL", f"http://pokemon-compare-service.{namespace}")
+counter_pokemon_service_url = os.getenv("COUNTER_POKEMON_URL", f"http://counter-pokemon-service.{namespace}")
+pokemon_compare_url = f"{pokemon_compare_service_url}/pokemon-compare/"
+pokemon_compare_batch_url = f"{pokemon_compare_service_url}/pokemon-compare-batch/"
+counter_pokemon_url = f"{counter_pokemon_service_url}/counter-pokemon/"
+counter_pokemon_stream_url = f"{counter_pokemon_service_url}/counter-pokemon/stream"
+matchup_matrix_url = f"{counter_pokemon_service_url}/matchup-matrix/"
+
+# Release the pooled backend connections when the server shuts down
+@asynccontextmanager
+async def lifespan(server):
+    try:
+        yield {}
+    finally:
+        await close_clients()
+
 
 # Create FastMCP server instance
-mcp = FastMCP("Pokemon Info MCP Server")
+mcp = FastMCP("Pokemon Info MCP Server", lifespan=lifespan)
+install_metrics(mcp)
+setup_tracing("pokemon-mcp-server")
+
+# Whether a failed backend call ran out of its latency budget
+def over_budget(error: Exception, deadline: float) -> bool:
+    if isinstance(error, BudgetExceeded):
+        return True
+    return isinstance(error, httpx.TimeoutException) and deadline is not None and time.monotonic() >= deadline
+
+
+def budget_exhausted() -> dict:
+    return {"error": "Request budget exhausted", "partial": True}
+
+
+# Pokémon names of an ability lookup as a bare list, errors pass through unchanged
+def ability_pokemons(result):
+    if isinstance(result, dict) and "pokemons" in result:
+        return result["pokemons"]
+    return result
+
 
 # Function to call services
-def call_service(endpoint: str, payload: dict):
-    logger.info(f"Calling {endpoint} with payload {payload}")
+# With a deadline the remaining budget goes along, and running out of it returns a marked error
+async def call_service(endpoint: str, payload: dict, deadline: float = None):
+    logger.info("Calling %s with payload %s", endpoint, payload)
+    label = endpoint_label(endpoint)
+    start = time.perf_counter()
+    status = "error"
     try:
-        response = requests.post(endpoint, json=payload)
+        with tracer.start_as_current_span(f"call {label}", kind=SpanKind.CLIENT, attributes={"http.url": endpoint}) as span, \
+                SERVICE_IN_FLIGHT.labels(label).track_inprogress():
+            response = await post_with_retries(endpoint, payload, headers=inject_headers(), deadline=deadline)
+            span.set_attribute("http.status_code", response.status_code)
+        status = str(response.status_code)
+        SERVICE_RESPONSE_SIZE.labels(label).observe(len(response.content))
         response.raise_for_status()
-        data = response.json()
-        logger.info(f"Received response: {data}")
+        data = loads(response.content)
+        logger.debug("Received response: %s", data)
         return data
-    except requests.HTTPError as e:
-        logger.error(f"HTTP error calling {endpoint}: {e} - Response: {response.text}")
+    except httpx.HTTPStatusError as e:
+        logger.error("HTTP error calling %s: %s - Response: %s", endpoint, e, response.text)
         return {"error": str(e), "detail": response.text}
     except Exception as e:
-        logger.error(f"Unexpected error calling {endpoint}: {e}")
+        if over_budget(e, deadline):
+            logger.warning("Request budget exhausted calling %s", endpoint)
+            return budget_exhausted()
+        logger.error("Unexpected error calling %s: %s", endpoint, e)
+        return {"error": str(e)}
+    finally:
+        SERVICE_LATENCY.labels(label, status).observe(time.perf_counter() - start)
+
+# Function to call streaming services, on_event is awaited for every event before the final one
+async def stream_service(endpoint: str, payload: dict, on_event=None, deadline: float = None):
+    logger.info("Streaming %s with payload %s", endpoint, payload)
+    label = endpoint_label(endpoint)
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with tracer.start_as_current_span(f"stream {label}", kind=SpanKind.CLIENT, attributes={"http.url": endpoint}), \
+                SERVICE_IN_FLIGHT.labels(label).track_inprogress():
+            async for event in stream_json_lines(endpoint, payload, headers=inject_headers(), deadline=deadline):
+                if event.get("event") in ("final", "error"):
+                    status = "200"
+                    return event
+                if on_event is not None:
+                    await on_event(event)
+        return {"error": "Stream ended without a final result"}
+    except httpx.HTTPStatusError as e:
+        status = str(e.response.status_code)
+        logger.error("HTTP error streaming %s: %s", endpoint, e)
+        return {"error": str(e)}
+    except Exception as e:
+        if over_budget(e, deadline):
+            logger.warning("Request budget exhausted streaming %s", endpoint)
+            return budget_exhausted()
+        logger.error("Unexpected error streaming %s: %s", endpoint, e)
         return {"error": str(e)}
+    finally:
+        SERVICE_LATENCY.labels(label, status).observe(time.perf_counter() - start)
 
 @mcp.tool(
     name="pokemon_info",
     description="Fetch detailed information about a Pokémon by name.",
     tags={"pokemon", "info"}
 )
-def pokemon_info(
+async def pokemon_info(
     pokemon_name: Annotated[str, Field(description="The name of the Pokémon to retrieve information for, e.g., 'pikachu'.")]
 ):
     endpoint = f"{pokemon_info_url}/pokemon-info"
-    return call_service(endpoint, {"pokemon_name": pokemon_name})
+    return await call_service(endpoint, {"pokemon_name": pokemon_name})
 
 @mcp.tool(
     name="pokemon_evolution_chain",
-    description="Get the evolution chain of a specified Pokémon.",
+    description=(
+        "Get the evolution chain of a specified Pokémon. Returns every species of the family "
+        "and the full evolution tree with branches and evolution conditions."
+    ),
     tags={"pokemon", "evolution"}
 )
-def pokemon_evolution_chain(
+async def pokemon_evolution_chain(
     pokemon_name: Annotated[str, Field(description="The name of the Pokémon to retrieve its evolution chain, e.g., 'charmander'.")]
 ):
     endpoint = f"{pokemon_info_url}/pokemon-evolution-chain"
-    result = call_service(endpoint, {"pokemon_name": pokemon_name})
-    if "evolution_chain" in result:
-        return result["evolution_chain"]
+    result = await call_service(endpoint, {"pokemon_name": pokemon_name})
     return result
 
 @mcp.tool(
@@ -74,50 +150,86 @@ def pokemon_evolution_chain(
     description="Retrieve a list of Pokémon that have a specified ability.",
     tags={"pokemon", "ability"}
 )
-def pokemon_ability(
+async def pokemon_ability(
     ability_name: Annotated[str, Field(description="The ability name to filter Pokémon by, e.g., 'overgrow'.")]
 ):
     endpoint = f"{pokemon_info_url}/pokemon-ability"
-    result = call_service(endpoint, {"ability_name": ability_name})
-    if "pokemons" in result:
-        return result["pokemons"]
-    return result
+    result = await call_service(endpoint, {"ability_name": ability_name})
+    return ability_pokemons(result)
 
 @mcp.tool(
     name="pokemon_move",
     description="Get detailed information about a Pokémon move by name.",
     tags={"pokemon", "move"}
 )
-def pokemon_move(
+async def pokemon_move(
     move_name: Annotated[str, Field(description="The name of the move to retrieve details for, e.g., 'thunderbolt'.")]
 ):
     endpoint = f"{pokemon_info_url}/pokemon-move"
-    return call_service(endpoint, {"move_name": move_name})
+    return await call_service(endpoint, {"move_name": move_name})
 
 @mcp.tool(
     name="pokemon_species",
     description="Fetch species details of a Pokémon by name.",
     tags={"pokemon", "species"}
 )
-def pokemon_species(
+async def pokemon_species(
     pokemon_name: Annotated[str, Field(description="The Pokémon name for which to get species details, e.g., 'bulbasaur'.")]
 ):
     endpoint = f"{pokemon_info_url}/pokemon-species"
-    return call_service(endpoint, {"pokemon_name": pokemon_name})
+    return await call_service(endpoint, {"pokemon_name": pokemon_name})
 
 @mcp.tool(
     name="pokemon_habitat",
     description="Retrieve the habitat information of a Pokémon by name.",
     tags={"pokemon", "habitat"}
 )
-def pokemon_habitat(
+async def pokemon_habitat(
     pokemon_name: Annotated[str, Field(description="The name of the Pokémon to get habitat information for, e.g., 'squirtle'.")]
 ):
     endpoint = f"{pokemon_info_url}/pokemon-habitat"
-    result = call_service(endpoint, {"pokemon_name": pokemon_name})
+    result = await call_service(endpoint, {"pokemon_name": pokemon_name})
     return result
 
 
+@mcp.tool(
+    name="pokemon_query",
+    description=(
+        "Find Pokémon matching several criteria at once. 'all_of' and 'any_of' take lists of "
+        "abilities, moves, types and egg_groups (AND and OR respectively); 'stats' takes ranges "
+        "like {'speed': {'min': 100}}. Returns the match count and matching names."
+    ),
+    tags={"pokemon", "query", "search"}
+)
+async def pokemon_query(
+    all_of: Annotated[dict, Field(description="Values that must all match, e.g. {'abilities': ['static'], 'moves': ['thunderbolt']}.")] = {},
+    any_of: Annotated[dict, Field(description="Values of which at least one must match, e.g. {'types': ['water', 'ice']}.")] = {},
+    stats: Annotated[dict, Field(description="Base stat ranges, e.g. {'speed': {'min': 100}, 'attack': {'max': 80}}.")] = {},
+    limit: Annotated[int, Field(description="Maximum number of names to return.")] = 100
+) -> dict:
+    endpoint = f"{pokemon_info_url}/pokemon-query"
+    payload = {"all_of": all_of, "any_of": any_of, "stats": stats, "limit": limit}
+    return await call_service(endpoint, payload)
+
+
+@mcp.tool(
+    name="pokemon_suggest",
+    description=(
+        "Autocomplete or spell-correct a Pokémon, species, move or ability name. Returns the "
+        "resolved canonical name (or null), names starting with the query and close matches "
+        "by edit distance. Use it before other tools when unsure of a spelling."
+    ),
+    tags={"pokemon", "search"}
+)
+async def pokemon_suggest(
+    query: Annotated[str, Field(description="Full or partial name, e.g. 'pikachoo', 'mr mime' or 'char'.")],
+    kind: Annotated[Literal["pokemon", "pokemon-species", "move", "ability"], Field(description="Kind of name to search.")] = "pokemon",
+    limit: Annotated[int, Field(description="Maximum number of matches of each kind.")] = 10
+) -> dict:
+    endpoint = f"{pokemon_info_url}/pokemon-suggest"
+    return await call_service(endpoint, {"query": query, "kind": kind, "limit": limit})
+
+
 @mcp.tool(
     name="pokemon_compare",
     description=(
@@ -126,14 +238,33 @@ def pokemon_habitat(
     ),
     tags={"pokemon", "compare", "battle"}
 )
-def pokemon_compare(
+async def pokemon_compare(
     pokemon_name1: Annotated[str, Field(description="Name of the first Pokémon to compare")],
-    pokemon_name2: Annotated[str, Field(description="Name of the second Pokémon to compare")]
-) -> dict:
+    pokemon_name2: Annotated[str, Field(description="Name of the second Pokémon to compare")],
+    budget_ms: Annotated[float | None, Field(description="Latency budget in milliseconds; when it runs out the result is partial and marked 'partial': true.")] = None
+) -> dict | list:
     payload = {"pokemon_name1": pokemon_name1, "pokemon_name2": pokemon_name2}
-    result = call_service(pokemon_compare_url, payload)
+    result = await call_service(pokemon_compare_url, payload, deadline=request_deadline(budget_ms))
     return result
-    
+
+
+@mcp.tool(
+    name="pokemon_compare_batch",
+    description=(
+        "Compare a whole team of Pokémon (2 to 24 names) in one call. Returns columnar base stats "
+        "with per-stat ranks, deltas from the team mean, z-scores and team aggregates."
+    ),
+    tags={"pokemon", "compare", "battle", "team"}
+)
+async def pokemon_compare_batch(
+    pokemon_names: Annotated[list[str], Field(description="Names of the Pokémon to compare, e.g. ['pikachu', 'charizard', 'snorlax'].")],
+    budget_ms: Annotated[float | None, Field(description="Latency budget in milliseconds; when it runs out the result is partial and marked 'partial': true.")] = None
+) -> dict:
+    payload = {"pokemon_names": pokemon_names}
+    result = await call_service(pokemon_compare_batch_url, payload, deadline=request_deadline(budget_ms))
+    return result
+
+
 @mcp.tool(
     name="counter_pokemon",
     description=(
@@ -143,13 +274,113 @@ def pokemon_compare(
     ),
     tags={"pokemon", "counter", "battle", "strategy"}
 )
-def counter_pokemon(
-    pokemon_name: Annotated[str, Field(description="Name of the Pokémon to find counters for")]
-) -> dict:
+async def counter_pokemon(
+    pokemon_name: Annotated[str, Field(description="Name of the Pokémon to find counters for")],
+    ctx: Context,
+    budget_ms: Annotated[float | None, Field(description="Latency budget in milliseconds; when it runs out the result is partial and marked 'partial': true.")] = None
+) -> dict | list:
     payload = {"pokemon_name": pokemon_name}
-    result = call_service(counter_pokemon_url, payload)
-    return result
+    # Without a budget the stream endpoint cuts off at its own COUNTER_STREAM_DEADLINE
+    deadline = request_deadline(budget_ms)
+
+    # Provisional rankings become progress notifications
+    async def report(event):
+        await ctx.report_progress(progress=event["loaded"], total=event["candidates"])
+        names = ", ".join(counter["Name"] for counter in event["counters"])
+        await ctx.info(f"Provisional counters ({event['loaded']}/{event['candidates']} loaded): {names}")
+
+    event = await stream_service(counter_pokemon_stream_url, payload, on_event=report, deadline=deadline)
+    if event.get("event") == "final" and event["dropped"]:
+        cutoff = "Request budget exhausted" if deadline is not None else "Stream deadline reached"
+        return {
+            "partial": True,
+            "detail": f"{cutoff} before all candidate stats arrived",
+            "candidates": event["candidates"],
+            "dropped": event["dropped"],
+            "counters": event["counters"],
+        }
+    if event.get("event") == "final":
+        return event["counters"]
+    if event.get("event") == "error":
+        return {"error": f"{event['status_code']} from counter service", "detail": event["detail"]}
+    return event
+
 
+@mcp.tool(
+    name="pokemon_matchup_matrix",
+    description=(
+        "Score every Pokémon of one team against every Pokémon of another in one call. Returns "
+        "N×M matrices of best-move type effectiveness, expected damage dealt and taken (% of HP), "
+        "speed comparison (1 faster, 0 tie, -1 slower) and 1v1 wins, plus per-member win counts and the best "
+        "answer to each opponent, as lists in roster order."
+    ),
+    tags={"pokemon", "counter", "battle", "team", "strategy"}
+)
+async def pokemon_matchup_matrix(
+    team1: Annotated[list[str], Field(description="Your team, e.g. ['pikachu', 'charizard', 'snorlax'].")],
+    team2: Annotated[list[str], Field(description="The opposing team, e.g. ['blastoise', 'gengar'].")],
+    budget_ms: Annotated[float | None, Field(description="Latency budget in milliseconds.")] = None
+) -> dict:
+    payload = {"team1": team1, "team2": team2}
+    return await call_service(matchup_matrix_url, payload, deadline=request_deadline(budget_ms))
+
+
+# Tools that can be dispatched in a batch, with their backend endpoints
+BATCH_ENDPOINTS = {
+    "pokemon_info": f"{pokemon_info_url}/pokemon-info",
+    "pokemon_evolution_chain": f"{pokemon_info_url}/pokemon-evolution-chain",
+    "pokemon_ability": f"{pokemon_info_url}/pokemon-ability",
+    "pokemon_move": f"{pokemon_info_url}/pokemon-move",
+    "pokemon_species": f"{pokemon_info_url}/pokemon-species",
+    "pokemon_habitat": f"{pokemon_info_url}/pokemon-habitat",
+    "pokemon_query": f"{pokemon_info_url}/pokemon-query",
+    "pokemon_suggest": f"{pokemon_info_url}/pokemon-suggest",
+    "pokemon_compare": pokemon_compare_url,
+    "pokemon_compare_batch": pokemon_compare_batch_url,
+    "counter_pokemon": counter_pokemon_url,
+    "pokemon_matchup_matrix": matchup_matrix_url,
+}
+
+# Reshaping of backend results, so a batched call returns what the standalone tool does
+BATCH_RESULTS = {
+    "pokemon_ability": ability_pokemons,
+}
+
+
+# Format of one call in a batch
+class BatchCall(BaseModel):
+    tool: Literal[
+        "pokemon_info", "pokemon_evolution_chain", "pokemon_ability", "pokemon_move",
+        "pokemon_species", "pokemon_habitat", "pokemon_query", "pokemon_suggest", "pokemon_compare",
+        "pokemon_compare_batch", "counter_pokemon", "pokemon_matchup_matrix",
+    ]
+    arguments: dict = Field(description="Arguments of the tool, e.g. {'pokemon_name': 'pikachu'}.")
+
+
+@mcp.tool(
+    name="pokemon_batch",
+    description=(
+        "Run several Pokémon tool calls (info, compare, counter and the other lookups) concurrently "
+        "and return all results together, in the same order as the calls."
+    ),
+    tags={"pokemon", "batch"}
+)
+async def pokemon_batch(
+    calls: Annotated[list[BatchCall], Field(description="Tool calls to run, e.g. [{'tool': 'pokemon_info', 'arguments': {'pokemon_name': 'pikachu'}}].")],
+    budget_ms: Annotated[float | None, Field(description="Latency budget in milliseconds; when it runs out the result is partial and marked 'partial': true.")] = None
+) -> dict:
+    # All calls of the batch share one deadline
+    deadline = request_deadline(budget_ms)
+    with tracer.start_as_current_span("pokemon_batch", attributes={"batch.size": len(calls)}):
+        results = await asyncio.gather(
+            *(call_service(BATCH_ENDPOINTS[call.tool], call.arguments, deadline=deadline) for call in calls)
+        )
+    return {
+        "results": [
+            {"tool": call.tool, "arguments": call.arguments, "result": BATCH_RESULTS.get(call.tool, lambda r: r)(result)}
+            for call, result in zip(calls, results)
+        ]
+    }
 
 
 if __name__ == "__main__":
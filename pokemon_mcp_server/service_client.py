@@ -0,0 +1,133 @@
+# Import libraries
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import urlsplit
+import httpx
+from fastmcp.server.dependencies import get_http_headers
+from metrics import SERVICE_RETRIES, endpoint_label
+from log_setup import get_logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = get_logger()
+
+# Backend call settings
+MAX_CONNECTIONS_PER_SERVICE = int(os.getenv("SERVICE_MAX_CONNECTIONS", "20"))
+CONNECT_TIMEOUT = float(os.getenv("SERVICE_CONNECT_TIMEOUT", "2"))
+READ_TIMEOUT = float(os.getenv("SERVICE_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("SERVICE_MAX_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("SERVICE_RETRY_BACKOFF", "0.1"))
+RETRY_STATUS_CODES = {502, 503, 504}
+# Latency budget of a tool call when neither the client nor a header sets one, unset means none
+DEFAULT_BUDGET_MS = float(os.getenv("SERVICE_REQUEST_BUDGET_MS")) if os.getenv("SERVICE_REQUEST_BUDGET_MS") else None
+# Milliseconds of the budget kept back for the response to travel back from a backend
+BUDGET_MARGIN_MS = float(os.getenv("SERVICE_BUDGET_MARGIN_MS", "50"))
+
+# Header carrying the remaining latency budget in milliseconds, read by the backends
+BUDGET_HEADER = "X-Request-Budget-Ms"
+
+
+# Decode a backend JSON body, with orjson when it is installed
+def loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+# Raised when a tool call's latency budget runs out before its backend call
+class BudgetExceeded(Exception):
+    pass
+
+
+# Monotonic deadline of a tool call from the client's budget_ms, the incoming budget header
+# or SERVICE_REQUEST_BUDGET_MS, None without a budget
+def request_deadline(budget_ms: float = None):
+    if budget_ms is None:
+        header = get_http_headers().get(BUDGET_HEADER.lower())
+        try:
+            budget_ms = float(header) if header is not None else DEFAULT_BUDGET_MS
+        except ValueError:
+            logger.warning("Ignoring malformed %s header: %s", BUDGET_HEADER, header)
+            budget_ms = DEFAULT_BUDGET_MS
+    return time.monotonic() + budget_ms / 1000 if budget_ms is not None else None
+
+
+# Headers and timeout of a backend call within the deadline
+def _budgeted(headers: dict, deadline: float):
+    if deadline is None:
+        return headers, httpx.USE_CLIENT_DEFAULT
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise BudgetExceeded("Request budget exhausted")
+    headers = {**(headers or {}), BUDGET_HEADER: str(max(int(left * 1000 - BUDGET_MARGIN_MS), 0))}
+    return headers, httpx.Timeout(min(READ_TIMEOUT, left), connect=min(CONNECT_TIMEOUT, left))
+
+
+# One connection pool per backend service
+_clients = {}
+
+
+def get_client(endpoint: str) -> httpx.AsyncClient:
+    parts = urlsplit(endpoint)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    client = _clients.get(origin)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=origin,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS_PER_SERVICE,
+                max_keepalive_connections=MAX_CONNECTIONS_PER_SERVICE,
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        _clients[origin] = client
+    return client
+
+
+async def close_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+# Exponential backoff with full jitter
+def backoff_delay(attempt: int) -> float:
+    return random.uniform(0, RETRY_BACKOFF * (2 ** attempt))
+
+
+# POST to a backend service, retrying transport errors and 502/503/504
+# With a deadline, every attempt sends the remaining budget and times out when it runs out
+async def post_with_retries(endpoint: str, payload: dict, headers: dict = None, deadline: float = None) -> httpx.Response:
+    client = get_client(endpoint)
+    for attempt in range(MAX_RETRIES + 1):
+        attempt_headers, timeout = _budgeted(headers, deadline)
+        try:
+            response = await client.post(endpoint, json=payload, headers=attempt_headers, timeout=timeout)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            SERVICE_RETRIES.labels(endpoint_label(endpoint), str(response.status_code)).inc()
+            logger.warning("Retrying %s after status code %s", endpoint, response.status_code)
+        except httpx.TransportError as e:
+            if attempt == MAX_RETRIES:
+                raise
+            SERVICE_RETRIES.labels(endpoint_label(endpoint), type(e).__name__).inc()
+            logger.warning("Retrying %s after transport error: %s", endpoint, e)
+        delay = backoff_delay(attempt)
+        if deadline is not None:
+            delay = min(delay, max(deadline - time.monotonic(), 0))
+        await asyncio.sleep(delay)
+
+
+# POST to a backend service and yield the JSON objects of its NDJSON response as they arrive
+async def stream_json_lines(endpoint: str, payload: dict, headers: dict = None, deadline: float = None):
+    client = get_client(endpoint)
+    headers, timeout = _budgeted(headers, deadline)
+    async with client.stream("POST", endpoint, json=payload, headers=headers, timeout=timeout) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield loads(line)